@@ -3,18 +3,265 @@ Flask API Server for Football Predictions
 Serves predictions to mobile app
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from predictor import FootballPredictor
-from datetime import datetime
+from predictor import FootballPredictor, LEAGUES
+from injuries import InjuryFeed
+import metrics
+from prediction_store import PredictionStore, RefreshScheduler
+from ratings import RatingStore, SharedRatings
+from snapshot import read_snapshot, restore, snapshot_ratings
+from cache import FixtureCache
+from fixtures import Fixture
+from simulation import simulate_league
+from serialization import (dumps, iter_json_array, iter_json_document, iter_ndjson,
+                           iter_ndjson_lines, orjson, parse_fields, select_fields)
+from itertools import islice
+from datetime import date, datetime
+import hmac
+import json
+import logging
 import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    jsonify() through orjson when installed (sorted keys, so ETags stay
+    stable), timed as the "serialize" stage
+    """
+    
+    def dumps(self, obj, **kwargs):
+        with metrics.stage('serialize'):
+            if orjson is not None:
+                return dumps(obj).decode()
+            return super().dumps(obj, **kwargs)
+
 
 app = Flask(__name__)
 CORS(app)  # Allow requests from Flutter app
+app.json = FastJSONProvider(app)
 
 # Initialize predictor
 API_KEY = os.getenv('FOOTBALL_API_KEY', 'YOUR_API_KEY')
-predictor = FootballPredictor(api_key=API_KEY)
+DETERMINISTIC = os.getenv('PREDICTION_DETERMINISTIC', '1') == '1'
+
+# Prebuilt data from `python snapshot.py`, if present, saves rebuilding it
+SNAPSHOT_PATH = os.getenv('SNAPSHOT_PATH', 'snapshot.bin')
+
+# Ratings and injuries changed by one worker reach the others through their
+# shared stores within this many seconds
+SHARED_STATE_SYNC_SECONDS = float(os.getenv('SHARED_STATE_SYNC_SECONDS', 1.0))
+
+# Precomputed predictions, refreshed in the background
+REFRESH_SECONDS = float(os.getenv('PREDICTION_REFRESH_SECONDS', 900))
+
+# Live injuries; a change re-predicts only the stored fixtures of the teams involved.
+# Workers not running the feed load what it saves to INJURY_STATE_PATH.
+INJURY_POLL_SECONDS = float(os.getenv('INJURY_POLL_SECONDS', 14400))
+
+# Season simulations keyed by (league, runs, seed, data version); recomputed
+# in the background once older than SIMULATION_TTL
+SIMULATION_RUNS = int(os.getenv('SIMULATION_RUNS', 100000))
+MAX_SIMULATION_RUNS = int(os.getenv('MAX_SIMULATION_RUNS', 1000000))
+SIMULATION_WORKERS = int(os.getenv('SIMULATION_WORKERS', 0)) or None
+
+# Simulation processes are spawned, and a spawned child re-runs the script
+# that started the parent as __mp_main__. Under `python api.py` that is this
+# file; the children need none of the stores and services below.
+if __name__ != '__mp_main__':
+    startup_snapshot = read_snapshot(SNAPSHOT_PATH)
+
+    # Team ratings continue from the latest stored results
+    rating_store = RatingStore(os.getenv('RATINGS_STORE_PATH', 'ratings.db'))
+    snapshot_initial = snapshot_ratings(startup_snapshot, rating_store)
+    shared_ratings = SharedRatings(rating_store, initial=snapshot_initial, interval=SHARED_STATE_SYNC_SECONDS)
+    predictor = FootballPredictor(api_key=API_KEY, deterministic=DETERMINISTIC,
+                                  ratings=shared_ratings.ratings)
+    snapshot_info = dict(restore(predictor, startup_snapshot), path=SNAPSHOT_PATH,
+                         ratings=snapshot_initial is not None) if startup_snapshot else None
+    leagues = startup_snapshot['leagues'] if startup_snapshot else LEAGUES
+
+    # Active/shadow engine choice shared by every worker; see engines.py
+    predictor.engines.attach(os.getenv('ENGINE_STATE_PATH', 'engines.json'))
+
+    # A synthetic upstream brings its own, possibly much longer, league list
+    REFRESH_LEAGUES = [int(x) for x in os.getenv('PREDICTION_LEAGUES', '').split(',') if x.strip()] \
+        or getattr(predictor.client, 'league_ids', None) or [league['id'] for league in leagues]
+    # The only leagues /predictions will fetch on demand and store
+    KNOWN_LEAGUES = set(REFRESH_LEAGUES) | {league['id'] for league in leagues}
+    store = PredictionStore(os.getenv('PREDICTION_STORE_PATH', 'predictions.db'))
+    scheduler = RefreshScheduler(predictor, store, REFRESH_LEAGUES, interval=REFRESH_SECONDS)
+
+    injury_feed = InjuryFeed(predictor.client, predictor.injury_index, REFRESH_LEAGUES,
+                             interval=INJURY_POLL_SECONDS, on_change=scheduler.refresh_teams,
+                             state_path=os.getenv('INJURY_STATE_PATH', 'injuries.pkl') if INJURY_POLL_SECONDS > 0 else None,
+                             sync_interval=SHARED_STATE_SYNC_SECONDS)
+
+    simulation_cache = FixtureCache(ttl=float(os.getenv('SIMULATION_TTL', 3600)), stale_ttl=86400, max_entries=64)
+
+
+def load_slates(league_ids: list) -> dict:
+    """
+    Stored (fixture, prediction) pairs per league. Leagues the scheduler has
+    not refreshed recently are recomputed synchronously first; with
+    PREDICTION_REFRESH_SECONDS=0 stored slates never expire and only leagues
+    with nothing stored yet are computed here.
+    """
+    with metrics.stage('store'):
+        stale = [league_id for league_id in league_ids if not store.is_fresh(league_id, REFRESH_SECONDS)]
+    if stale:
+        scheduler.refresh(stale)
+    with metrics.stage('store'):
+        return {league_id: store.league(league_id) for league_id in league_ids}
+
+
+def start_background_jobs():
+    """
+    Start the prediction refresh scheduler and injury feed (once per serving
+    process), plus a thread following ratings stored by other workers
+    """
+    if REFRESH_SECONDS > 0:
+        scheduler.start()
+    if INJURY_POLL_SECONDS > 0:
+        injury_feed.start()
+    threading.Thread(target=follow_shared_state, name='shared-state-sync', daemon=True).start()
+
+
+def sync_shared_state():
+    """
+    Load ratings and injuries other workers changed. New ratings wake the
+    refresh scheduler, which only runs in the background jobs worker.
+    """
+    if shared_ratings.sync():
+        predictor.set_ratings(shared_ratings.ratings)
+        scheduler.trigger()
+    injury_feed.sync()
+
+
+def follow_shared_state():
+    # Requests sync too, but the jobs worker must catch up even when idle
+    while True:
+        time.sleep(max(SHARED_STATE_SYNC_SECONDS, 0.1))
+        try:
+            sync_shared_state()
+        except Exception as e:
+            logger.exception("Shared state sync failed: %s", e)
+
+
+def reopen_stores():
+    """Fresh SQLite connections in a forked worker (gunicorn preload_app)"""
+    store.reopen()
+    rating_store.reopen()
+
+
+def warm_caches(league_ids: list = None) -> dict:
+    """
+    Fill this process's fixture cache and make sure the prediction store is
+    fresh for the given leagues (default: every configured league), so the
+    first request is not a cold miss. Returns fixtures per league.
+    """
+    league_ids = league_ids or REFRESH_LEAGUES
+    predictor.get_upcoming_matches_many(league_ids)
+    slates = load_slates(league_ids)
+    return {league_id: len(slate) for league_id, slate in slates.items()}
+
+
+REQUEST_SECONDS = metrics.histogram(
+    'football_http_request_duration_seconds', 'Time to produce a response (streamed bodies excluded)',
+    ('endpoint', 'method', 'status')
+)
+PROFILE_HEADER = 'X-Profile'
+
+# When set, /admin/* requires `Authorization: Bearer <ADMIN_TOKEN>`
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
+
+
+def _cache_lookups():
+    fixture = predictor.fixture_cache.stats()
+    memo = predictor.predict_memo.stats()
+    return {
+        ('fixture', 'hit'): fixture['hits'],
+        ('fixture', 'stale_hit'): fixture['stale_hits'],
+        ('fixture', 'miss'): fixture['misses'],
+        ('predict_memo', 'hit'): memo['hits'],
+        ('predict_memo', 'miss'): memo['misses'],
+    }
+
+
+metrics.gauge('football_cache_lookups_total', 'Cache lookups by result', _cache_lookups,
+              ('cache', 'result'), kind='counter')
+metrics.gauge('football_cache_hit_ratio', 'Cache hit ratio since start', lambda: {
+    ('fixture',): predictor.fixture_cache.stats()['hit_ratio'],
+    ('predict_memo',): predictor.predict_memo.stats()['hit_ratio'],
+}, ('cache',))
+metrics.gauge('football_upstream_quota_remaining', 'api-sports requests left in the current window', lambda: {
+    ('daily',): predictor.client.rate_limit.get('daily_remaining'),
+    ('minute',): predictor.client.rate_limit.get('minute_remaining'),
+}, ('window',))
+metrics.gauge('football_upstream_circuit_open', '1 while the upstream circuit breaker is failing fast',
+              lambda: int(predictor.client.stats().get('circuit') == 'open'))
+metrics.gauge('football_stored_predictions', 'Predictions in the precomputed store',
+              lambda: store.stats()['predictions'])
+
+
+@app.before_request
+def start_timer():
+    g.request_start = time.perf_counter()
+    if request.headers.get(PROFILE_HEADER, '').lower() in ('1', 'true', 'yes'):
+        metrics.start_profile()
+
+
+@app.before_request
+def sync_worker_state():
+    sync_shared_state()
+
+
+@app.before_request
+def check_admin_token():
+    """Reject /admin/* requests without the admin token, when one is configured"""
+    if not ADMIN_TOKEN or not request.path.startswith('/admin/'):
+        return None
+    header = request.headers.get('Authorization', '')
+    if not hmac.compare_digest(header.encode(), f"Bearer {ADMIN_TOKEN}".encode()):
+        return jsonify({
+            'success': False,
+            'error': 'Admin token required'
+        }), 401
+    return None
+
+
+@app.after_request
+def record_timing(response):
+    """
+    Per-endpoint latency histogram; with `X-Profile: 1` the response also gets
+    a Server-Timing header breaking the time down by stage
+    """
+    elapsed = time.perf_counter() - g.request_start
+    endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+    REQUEST_SECONDS.observe(elapsed, endpoint=endpoint, method=request.method, status=response.status_code)
+    profile = metrics.end_profile()
+    if profile is not None:
+        response.headers['Server-Timing'] = metrics.server_timing(profile, elapsed)
+    return response
+
+
+@app.after_request
+def add_etag(response):
+    """
+    Strong ETag on JSON GET responses; a matching If-None-Match gets a 304.
+    Deterministic predictions make the body stable between refreshes.
+    """
+    if (request.method == 'GET' and response.status_code == 200
+            and response.mimetype == 'application/json' and not response.is_streamed):
+        response.add_etag()
+        response.headers.setdefault('Cache-Control', 'no-cache')
+        response.make_conditional(request)
+    return response
 
 
 @app.route('/')
@@ -23,68 +270,179 @@ def home():
     return jsonify({
         'name': 'Football Match Predictor API',
         'version': '1.0',
+        'model_version': predictor.model_version,
+        'engine': predictor.engines.active.name,
+        'data_version': predictor.data_version,
+        'deterministic': predictor.deterministic,
         'endpoints': {
             '/predictions': 'GET - Get upcoming match predictions',
+            '/predictions/multi': 'GET - Predictions for many leagues (?leagues=39,140 or all)',
             '/predict': 'POST - Predict specific match',
-            '/leagues': 'GET - Get available leagues'
+            '/predict/bulk': 'POST - Predict many matchups (JSON array or NDJSON in, NDJSON out)',
+            '/leagues': 'GET - Get available leagues',
+            '/ratings': 'GET - Team ratings (?as_of=YYYY-MM-DD)',
+            '/injuries': 'GET - Players currently out, per team',
+            '/stats': 'GET - Cache statistics',
+            '/metrics': 'GET - Prometheus metrics',
+            '/admin/refresh': 'POST - Recompute stored predictions',
+            '/admin/results': 'POST - Apply match results to team ratings',
+            '/admin/engines': 'GET/POST - Prediction engines: load, activate, shadow'
         }
     })
 
 
+def format_prediction(match: Fixture, pred: dict) -> dict:
+    """Shape one fixture + prediction for the mobile app"""
+    return {
+        'match_id': match.id,
+        'date': match.date,
+        'league': match.league,
+        'venue': match.venue,
+        'home_team': {
+            'name': match.home,
+            'logo': match.home_logo
+        },
+        'away_team': {
+            'name': match.away,
+            'logo': match.away_logo
+        },
+        'prediction': pred['prediction'],
+        'confidence': pred['confidence'],
+        'score_prediction': pred['score_prediction'],
+        'probabilities': {
+            'home': pred['home_win_prob'],
+            'draw': pred['draw_prob'],
+            'away': pred['away_win_prob']
+        },
+        'reasons': pred['reasons']
+    }
+
+
+STREAM_MODES = ('ndjson', 'json')
+
+
+def predictions_response(slate, **extra):
+    """
+    Serialize (fixture, prediction) pairs honouring the optional query params
+    `fields` (comma-separated, dotted for nested keys) and `stream`:
+    "ndjson" sends one prediction per line, "json" a chunked JSON document.
+    """
+    fields = parse_fields(request.args.get('fields'))
+    items = (select_fields(format_prediction(match, pred), fields) for match, pred in slate)
+    mode = request.args.get('stream')
+    
+    if mode == 'ndjson':
+        return Response(stream_with_context(iter_ndjson_lines(items)), mimetype='application/x-ndjson')
+    if mode == 'json':
+        document = iter_json_document(items, 'predictions', dict(success=True, **extra))
+        return Response(stream_with_context(document), mimetype='application/json')
+    
+    predictions = list(items)
+    return jsonify({
+        'success': True,
+        'count': len(predictions),
+        **extra,
+        'predictions': predictions
+    })
+
+
+def invalid_stream_mode():
+    mode = request.args.get('stream')
+    if mode is not None and mode not in STREAM_MODES:
+        return jsonify({
+            'success': False,
+            'error': f"stream must be one of: {', '.join(STREAM_MODES)}"
+        }), 400
+    return None
+
+
+def unknown_leagues(league_ids: list):
+    unknown = [league_id for league_id in league_ids if league_id not in KNOWN_LEAGUES]
+    if unknown:
+        return jsonify({
+            'success': False,
+            'error': f"Unknown league(s): {', '.join(map(str, unknown))}"
+        }), 404
+    return None
+
+
 @app.route('/predictions', methods=['GET'])
 def get_predictions():
     """
     Get predictions for upcoming matches
-    Query params: league (default: 39 = Premier League)
+    Query params: league (default: 39 = Premier League),
+                  fields (e.g. match_id,home_team.name,prediction),
+                  stream (ndjson | json)
     """
     league_id = request.args.get('league', 39, type=int)
     
+    error = invalid_stream_mode() or unknown_leagues([league_id])
+    if error:
+        return error
+    
     try:
-        # Fetch upcoming matches
-        matches = predictor.get_upcoming_matches(league_id=league_id)
-        
-        # Generate predictions for each match
-        predictions = []
-        for match in matches:
-            home_team = match['teams']['home']['name']
-            away_team = match['teams']['away']['name']
-            
-            pred = predictor.predict_match(
-                home_team, 
-                away_team,
-                match['teams']['home']['id'],
-                match['teams']['away']['id']
-            )
-            
-            predictions.append({
-                'match_id': match['fixture']['id'],
-                'date': match['fixture']['date'],
-                'league': match['league']['name'],
-                'venue': match['fixture'].get('venue', {}).get('name', 'Unknown'),
-                'home_team': {
-                    'name': home_team,
-                    'logo': match['teams']['home'].get('logo', '')
-                },
-                'away_team': {
-                    'name': away_team,
-                    'logo': match['teams']['away'].get('logo', '')
-                },
-                'prediction': pred['prediction'],
-                'confidence': pred['confidence'],
-                'score_prediction': pred['score_prediction'],
-                'probabilities': {
-                    'home': pred['home_win_prob'],
-                    'draw': pred['draw_prob'],
-                    'away': pred['away_win_prob']
-                },
-                'reasons': pred['reasons']
-            })
+        # Precomputed slate (fetched and predicted in one batch when stale)
+        slate = load_slates([league_id])[league_id]
         
+        return predictions_response(slate)
+    
+    except Exception as e:
         return jsonify({
-            'success': True,
-            'count': len(predictions),
-            'predictions': predictions
-        })
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/predictions/multi', methods=['GET'])
+def get_multi_league_predictions():
+    """
+    Get predictions for several leagues in one round trip
+    Query params: leagues (comma-separated IDs, or "all" for every league in /leagues),
+                  fields, stream (as for /predictions)
+    """
+    raw = request.args.get('leagues', 'all')
+    
+    error = invalid_stream_mode()
+    if error:
+        return error
+    
+    if raw.strip().lower() == 'all':
+        league_ids = [league['id'] for league in leagues]
+    else:
+        try:
+            league_ids = list(dict.fromkeys(int(x) for x in raw.split(',') if x.strip()))
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': 'leagues must be "all" or comma-separated league IDs'
+            }), 400
+    
+    if not league_ids:
+        return jsonify({
+            'success': False,
+            'error': 'No leagues requested'
+        }), 400
+    
+    error = unknown_leagues(league_ids)
+    if error:
+        return error
+    
+    try:
+        # Stale leagues are fetched concurrently and predicted as one batch
+        slates = load_slates(league_ids)
+        
+        merged = []
+        seen = set()
+        for league_id in league_ids:
+            for match, pred in slates[league_id]:
+                # Mock fallbacks repeat the same fixtures for every league
+                if match.id in seen:
+                    continue
+                seen.add(match.id)
+                merged.append((match, pred))
+        merged.sort(key=lambda item: item[0].date)
+        
+        return predictions_response(merged, leagues=league_ids)
     
     except Exception as e:
         return jsonify({
@@ -97,10 +455,22 @@ def get_predictions():
 def predict_specific_match():
     """
     Predict a specific match
-    Body: { "home_team": "...", "away_team": "..." }
+    Body: { "home_team": "...", "away_team": "..." } or { "fixture_id": ... }
     """
     data = request.get_json()
     
+    if data and 'fixture_id' in data:
+        pred = store.fixture(data['fixture_id'])
+        if pred is None:
+            return jsonify({
+                'success': False,
+                'error': f"No stored prediction for fixture {data['fixture_id']}"
+            }), 404
+        return jsonify({
+            'success': True,
+            'prediction': pred
+        })
+    
     if not data or 'home_team' not in data or 'away_team' not in data:
         return jsonify({
             'success': False,
@@ -108,10 +478,14 @@ def predict_specific_match():
         }), 400
     
     try:
-        pred = predictor.predict_match(
-            data['home_team'],
-            data['away_team']
-        )
+        # Upcoming fixtures are precomputed; anything else is predicted live
+        with metrics.stage('store'):
+            pred = store.matchup(data['home_team'], data['away_team'])
+        if pred is None:
+            pred = predictor.predict_match_cached(
+                data['home_team'],
+                data['away_team']
+            )
         
         return jsonify({
             'success': True,
@@ -125,24 +499,337 @@ def predict_specific_match():
         }), 500
 
 
+BULK_BATCH_SIZE = int(os.getenv('BULK_BATCH_SIZE', 1000))
+NDJSON_TYPES = ('application/x-ndjson', 'application/ndjson', 'application/jsonl')
+
+
+BULK_ID_FIELDS = ('home_team_id', 'away_team_id', 'fixture_id')
+
+
+def bulk_item_error(item) -> str:
+    """Why one /predict/bulk input cannot be predicted, or None if it can"""
+    if isinstance(item, ValueError):
+        # Parse errors get a prefix; an overlong line explains itself
+        return f"Invalid JSON: {item}" if isinstance(item, json.JSONDecodeError) else str(item)
+    if not isinstance(item, dict) or not item.get('home_team') or not item.get('away_team'):
+        return 'Missing home_team or away_team'
+    if not isinstance(item['home_team'], str) or not isinstance(item['away_team'], str):
+        return 'home_team and away_team must be strings'
+    for field in BULK_ID_FIELDS:
+        value = item.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            return f"{field} must be an integer"
+    return None
+
+
+def predict_bulk_lines(items):
+    """
+    Predict matchups from any iterable in fixed-size batches, yielding one
+    NDJSON line per input so memory stays bounded by BULK_BATCH_SIZE
+    """
+    index = 0
+    items = iter(items)
+    error = None
+    while error is None:
+        batch = []
+        try:
+            batch.extend(islice(items, BULK_BATCH_SIZE))
+        except ValueError as e:
+            # Malformed body: answer what was read, then report and stop
+            error = e
+        if not batch and error is None:
+            return
+        
+        errors = [bulk_item_error(item) for item in batch]
+        valid = [item for item, item_error in zip(batch, errors) if item_error is None]
+        
+        preds = iter(predictor.predict_pairs(
+            [item['home_team'] for item in valid],
+            [item['away_team'] for item in valid],
+            [item.get('home_team_id') for item in valid],
+            [item.get('away_team_id') for item in valid],
+            fixture_ids=[item.get('fixture_id') for item in valid],
+        ))
+        
+        for item, item_error in zip(batch, errors):
+            if item_error is None:
+                line = {
+                    'index': index,
+                    'home_team': item['home_team'],
+                    'away_team': item['away_team'],
+                    'prediction': next(preds)
+                }
+            else:
+                line = {'index': index, 'error': item_error}
+            yield dumps(line) + b'\n'
+            index += 1
+    
+    yield dumps({'index': index, 'error': f"Invalid input: {error}"}) + b'\n'
+
+
+@app.route('/predict/bulk', methods=['POST'])
+def predict_bulk():
+    """
+    Predict many matchups in one request
+    Body: JSON array or NDJSON (Content-Type: application/x-ndjson) of
+          { "home_team": "...", "away_team": "...", "fixture_id": ... (optional) }
+    Response: NDJSON, one line per input in order, streamed as batches finish
+    """
+    stream = request.stream
+    items = iter_ndjson(stream, skip_invalid=True) if request.mimetype in NDJSON_TYPES else iter_json_array(stream)
+    
+    return Response(
+        stream_with_context(predict_bulk_lines(items)),
+        mimetype='application/x-ndjson'
+    )
+
+
 @app.route('/leagues', methods=['GET'])
 def get_leagues():
     """Get available leagues"""
-    leagues = [
-        {'id': 39, 'name': 'Premier League', 'country': 'England', 'flag': '🏴󠁧󠁢󠁥󠁮󠁧󠁿'},
-        {'id': 140, 'name': 'La Liga', 'country': 'Spain', 'flag': '🇪🇸'},
-        {'id': 135, 'name': 'Serie A', 'country': 'Italy', 'flag': '🇮🇹'},
-        {'id': 78, 'name': 'Bundesliga', 'country': 'Germany', 'flag': '🇩🇪'},
-        {'id': 61, 'name': 'Ligue 1', 'country': 'France', 'flag': '🇫🇷'},
-        {'id': 2, 'name': 'Champions League', 'country': 'Europe', 'flag': '⚽'},
-    ]
-    
     return jsonify({
         'success': True,
         'leagues': leagues
     })
 
 
+@app.route('/stats', methods=['GET'])
+def get_stats():
+    """Cache hit/miss/refresh/eviction counters"""
+    return jsonify({
+        'success': True,
+        'fixture_cache': predictor.fixture_cache.stats(),
+        'predict_memo': predictor.predict_memo.stats(),
+        'prediction_store': store.stats(),
+        'ratings': rating_store.stats(),
+        'injury_feed': injury_feed.stats(),
+        'scheduler': scheduler.stats(),
+        'engines': predictor.engines.stats(),
+        'upstream': predictor.client.stats(),
+        'snapshot': snapshot_info,
+        'simulation_cache': simulation_cache.stats()
+    })
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """Prometheus text-format metrics for this process"""
+    return Response(metrics.REGISTRY.render(), content_type=metrics.CONTENT_TYPE)
+
+
+@app.route('/admin/refresh', methods=['POST'])
+def force_refresh():
+    """
+    Recompute stored predictions now
+    Query params: league (optional, repeatable; default: every configured league)
+    """
+    league_ids = request.args.getlist('league', type=int) or None
+    
+    try:
+        counts = scheduler.refresh(league_ids)
+        return jsonify({
+            'success': True,
+            'refreshed': counts
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def is_iso_date(value) -> bool:
+    # Stored dates are compared as strings, so only the canonical form will do
+    try:
+        return isinstance(value, str) and date.fromisoformat(value).isoformat() == value
+    except ValueError:
+        return False
+
+
+@app.route('/ratings', methods=['GET'])
+def get_ratings():
+    """
+    Current team ratings
+    Query params: as_of (YYYY-MM-DD, optional) - ratings after results up to that date
+    """
+    as_of = request.args.get('as_of')
+    if as_of and not is_iso_date(as_of):
+        return jsonify({
+            'success': False,
+            'error': 'as_of must be YYYY-MM-DD'
+        }), 400
+    ratings = rating_store.as_of(as_of) if as_of else predictor.ratings
+    return jsonify({
+        'success': True,
+        **ratings.to_dict()
+    })
+
+
+@app.route('/injuries', methods=['GET'])
+def get_injuries():
+    """Players currently out, per team, with the injury data version"""
+    return jsonify({
+        'success': True,
+        'version': predictor.injury_version,
+        'injuries': predictor.injuries
+    })
+
+
+@app.route('/simulate', methods=['GET'])
+def simulate_season():
+    """
+    Monte Carlo finishing-position probabilities for the rest of a season
+    Query params: league (default: 39), sims (default: SIMULATION_RUNS), seed (default: 0)
+    """
+    league_id = request.args.get('league', 39, type=int)
+    sims = request.args.get('sims', SIMULATION_RUNS, type=int)
+    seed = request.args.get('seed', 0, type=int)
+    
+    if not 1 <= sims <= MAX_SIMULATION_RUNS:
+        return jsonify({
+            'success': False,
+            'error': f"sims must be between 1 and {MAX_SIMULATION_RUNS}"
+        }), 400
+    
+    if seed < 0:
+        return jsonify({
+            'success': False,
+            'error': 'seed must be a non-negative integer'
+        }), 400
+    
+    try:
+        key = (league_id, sims, seed, predictor.data_version)
+        # Results built on fallback data are served but never cached
+        result = simulation_cache.get(
+            key, lambda: simulate_league(predictor, league_id, sims, seed, workers=SIMULATION_WORKERS),
+            cacheable=lambda result: not result['degraded']
+        )
+        return jsonify({
+            'success': True,
+            **result
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+RESULT_FIELDS = ('date', 'home_team', 'away_team', 'home_goals', 'away_goals')
+
+
+def result_error(result) -> str:
+    """Why one /admin/results entry cannot be applied, or None if it can"""
+    if not isinstance(result, dict) or any(result.get(field) is None for field in RESULT_FIELDS):
+        return f"Each result needs: {', '.join(RESULT_FIELDS)}"
+    if not isinstance(result['home_team'], str) or not isinstance(result['away_team'], str):
+        return 'home_team and away_team must be strings'
+    for field in ('home_goals', 'away_goals'):
+        value = result[field]
+        if not isinstance(value, int) or isinstance(value, bool) or value < 0:
+            return f"{field} must be a non-negative integer"
+    for field in ('home_team_id', 'away_team_id'):
+        value = result.get(field)
+        if value is not None and (not isinstance(value, int) or isinstance(value, bool)):
+            return f"{field} must be an integer"
+    if not is_iso_date(result['date']):
+        return 'date must be YYYY-MM-DD'
+    return None
+
+
+@app.route('/admin/results', methods=['POST'])
+def apply_results():
+    """
+    Update team ratings from finished matches, then recompute stored predictions
+    Body: one result or a list of
+          { "date": "YYYY-MM-DD", "home_team": "...", "away_team": "...",
+            "home_goals": 2, "away_goals": 1, "home_team_id": ..., "away_team_id": ... }
+    """
+    data = request.get_json()
+    results = data if isinstance(data, list) else [data]
+    
+    for result in results:
+        error = result_error(result)
+        if error:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+    
+    try:
+        # Applied on top of whatever any worker stored last; the jobs worker
+        # picks the change up and re-predicts even if it was not this one
+        predictor.set_ratings(shared_ratings.apply(results))
+        scheduler.trigger()
+        
+        return jsonify({
+            'success': True,
+            'applied': len(results),
+            'version': predictor.ratings.version,
+            'as_of': predictor.ratings.as_of
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@app.route('/admin/engines', methods=['GET', 'POST'])
+def manage_engines():
+    """
+    List prediction engines with shadow-scoring results, or change them
+    Body (POST, every key optional, applied in this order):
+          { "load": "module:Class", "reload": false,
+            "activate": "engine name", "shadow": "engine name" or null }
+    Activating another engine recomputes the stored predictions.
+    """
+    if request.method == 'GET':
+        return jsonify({
+            'success': True,
+            **predictor.engines.stats()
+        })
+    
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({
+            'success': False,
+            'error': 'Body must be a JSON object with load, activate and/or shadow'
+        }), 400
+    
+    engines = predictor.engines
+    active = engines.active
+    try:
+        if data.get('load'):
+            engines.load(data['load'], reload=bool(data.get('reload')))
+        if data.get('activate'):
+            engines.activate(data['activate'])
+        if 'shadow' in data:
+            engines.set_shadow(data['shadow'])
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    try:
+        refreshed = scheduler.refresh() if engines.active is not active else {}
+        return jsonify({
+            'success': True,
+            'refreshed': refreshed,
+            **engines.stats()
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
@@ -153,7 +840,13 @@ def health_check():
 
 
 if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
     port = int(os.getenv('PORT', 5000))
     print(f"\n🚀 Football Predictor API running on http://localhost:{port}")
     print(f"📊 Access predictions at: http://localhost:{port}/predictions\n")
-    app.run(host='0.0.0.0', port=port, debug=True)
+    print("🏭 Production: gunicorn -c gunicorn.conf.py wsgi:app\n")
+    debug = os.getenv('FLASK_DEBUG', '1') == '1'
+    # With the debug reloader only the child process serves requests
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_jobs()
+    app.run(host='0.0.0.0', port=port, debug=debug, threaded=True)
@@ -0,0 +1,421 @@
+"""
+api-sports.io HTTP client
+One pooled keep-alive session with timeouts, bounded retries and
+rate-limit tracking, shared by every upstream endpoint. A token bucket keeps
+calls under the plan quota and a circuit breaker stops calling upstream
+while it keeps failing. `requests` is only imported when the first request
+is made, which keeps it off the startup path.
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, List
+from urllib.parse import urlencode
+
+import metrics
+
+
+DEFAULT_BASE_URL = "https://v3.football.api-sports.io"
+
+# Statuses worth retrying: transient upstream failure. A 429 is not retried
+# in place; its Retry-After blocks further calls instead (see _track_rate_limit)
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Longest Retry-After honoured, in seconds
+MAX_RETRY_AFTER = 86400
+
+UPSTREAM_SECONDS = metrics.histogram(
+    'football_upstream_request_duration_seconds', 'api-sports request latency, retries included', ('endpoint',)
+)
+UPSTREAM_REQUESTS = metrics.counter(
+    'football_upstream_requests_total', 'api-sports requests by HTTP status or failure kind', ('endpoint', 'status')
+)
+
+
+def _retry_after_seconds(value: str, default: float = 60) -> float:
+    """Retry-After (delay seconds or HTTP date) as seconds from now, capped"""
+    if not value:
+        return default
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            seconds = parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return default
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+
+class ApiSportsError(Exception):
+    """Upstream request failed, returned an error payload, or is rate limited"""
+
+    def __init__(self, message: str, status: int = None):
+        super().__init__(message)
+        self.status = status
+
+
+class TokenBucket:
+    """
+    Allows `rate` calls per second on average with bursts up to `capacity`.
+    acquire() waits up to `timeout` seconds for a token.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, timeout: float = 0.0) -> bool:
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def limit(self, rate: float = None, available: float = None):
+        """Tighten to what upstream reports: a lower rate, or fewer calls left"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if rate is not None and rate < self.rate:
+                self.rate = rate
+            if available is not None:
+                self._tokens = min(self._tokens, available)
+
+    @property
+    def tokens(self) -> float:
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures, failing fast for
+    `reset_timeout` seconds; then lets one trial call through (half-open)
+    and closes again if it succeeds.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now: float) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        return self.HALF_OPEN if now - self._opened_at >= self.reset_timeout else self.OPEN
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold and (self.failures == self.failure_threshold or self._trial):
+                self._opened_at = time.monotonic()
+                self.opened += 1
+            self._trial = False
+
+
+class ApiSportsClient:
+    """Thin wrapper around a pooled requests.Session for api-sports.io"""
+
+    def __init__(self, api_key: str = None, base_url: str = DEFAULT_BASE_URL,
+                 pool_size: int = 10, connect_timeout: float = 3.05, read_timeout: float = 10,
+                 max_retries: int = 3, backoff_factor: float = 0.5,
+                 requests_per_minute: float = 300, burst: int = 10, rate_wait: float = 2.0,
+                 failure_threshold: int = 5, reset_timeout: float = 30):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (connect_timeout, read_timeout)
+        self.api_key = api_key
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self._session = None
+
+        # Latest quota figures reported by upstream
+        self.rate_limit = {}
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+        self.bucket = TokenBucket(requests_per_minute / 60, burst)
+        self.rate_wait = rate_wait
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    @property
+    def session(self):
+        """The pooled requests.Session, created on first use"""
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._make_session()
+        return self._session
+
+    def _make_session(self):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset(['GET']),
+            # urllib3 would sleep out the whole Retry-After inside the request
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update({
+            'x-rapidapi-host': "v3.football.api-sports.io",
+            'x-rapidapi-key': self.api_key or "YOUR_API_KEY_HERE"
+        })
+        return session
+
+    @classmethod
+    def from_env(cls, api_key: str = None) -> 'ApiSportsClient':
+        """
+        Build a client configured from FOOTBALL_API_* environment variables.
+        With FOOTBALL_API_RECORDINGS set, responses are replayed from that
+        directory instead (and recorded from upstream when FOOTBALL_API_RECORD=1);
+        with FOOTBALL_API_SYNTHETIC set, they are generated (see synthetic.py).
+        """
+        synthetic = os.getenv('FOOTBALL_API_SYNTHETIC')
+        if synthetic:
+            from synthetic import SyntheticApiClient, SyntheticData
+            return SyntheticApiClient(SyntheticData.from_spec(synthetic))
+        recordings = os.getenv('FOOTBALL_API_RECORDINGS')
+        if recordings:
+            live = None
+            if os.getenv('FOOTBALL_API_RECORD') == '1':
+                live = cls._from_env(api_key)
+            return RecordedApiClient(recordings, live=live)
+        return cls._from_env(api_key)
+
+    @classmethod
+    def _from_env(cls, api_key: str = None) -> 'ApiSportsClient':
+        return cls(
+            api_key=api_key,
+            base_url=os.getenv('FOOTBALL_API_BASE_URL', DEFAULT_BASE_URL),
+            pool_size=int(os.getenv('FOOTBALL_API_POOL_SIZE', 10)),
+            connect_timeout=float(os.getenv('FOOTBALL_API_CONNECT_TIMEOUT', 3.05)),
+            read_timeout=float(os.getenv('FOOTBALL_API_READ_TIMEOUT', 10)),
+            max_retries=int(os.getenv('FOOTBALL_API_MAX_RETRIES', 3)),
+            requests_per_minute=float(os.getenv('FOOTBALL_API_RATE_LIMIT', 300)),
+            burst=int(os.getenv('FOOTBALL_API_BURST', 10)),
+            failure_threshold=int(os.getenv('FOOTBALL_API_BREAKER_FAILURES', 5)),
+            reset_timeout=float(os.getenv('FOOTBALL_API_BREAKER_RESET', 30)),
+        )
+
+    def get(self, path: str, params: Dict = None) -> List[Dict]:
+        """GET an api-sports endpoint and return its `response` list"""
+        endpoint = path.strip('/')
+        wait = self._blocked_until - time.time()
+        if wait > 0:
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='rate_limited')
+            raise ApiSportsError(f"Rate limited for another {wait:.0f}s", status=429)
+        if self.breaker.state == CircuitBreaker.OPEN:
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='circuit_open')
+            raise ApiSportsError("Upstream failing; circuit open", status=503)
+        if not self.bucket.acquire(self.rate_wait):
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='throttled')
+            raise ApiSportsError("Request budget exhausted; try again shortly", status=429)
+        # Half-open lets a single trial call through
+        if not self.breaker.allow():
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='circuit_open')
+            raise ApiSportsError("Upstream failing; circuit open", status=503)
+
+        url = f"{self.base_url}/{endpoint}"
+        session = self.session
+        from requests import RequestException
+
+        start = time.perf_counter()
+        try:
+            response = session.get(url, params=params, timeout=self.timeout)
+        except RequestException as e:
+            self.breaker.record_failure()
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='error')
+            raise ApiSportsError(f"Request to {path} failed: {e}") from e
+        finally:
+            UPSTREAM_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
+        self._track_rate_limit(response)
+
+        if response.status_code != 200:
+            # Server errors and rate limiting count against upstream health;
+            # other client errors are our own doing
+            if response.status_code >= 500 or response.status_code == 429:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success()
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status=str(response.status_code))
+            raise ApiSportsError(f"API Error: {response.status_code}", status=response.status_code)
+        self.breaker.record_success()
+
+        data = response.json()
+        # api-sports reports bad keys, plan limits etc. as 200 with an `errors` field
+        errors = data.get('errors')
+        if errors:
+            UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='api_error')
+            raise ApiSportsError(f"API Error: {errors}", status=response.status_code)
+        UPSTREAM_REQUESTS.inc(endpoint=endpoint, status='200')
+        return data.get('response', [])
+
+    def fixtures(self, league_id: int, season: int, from_date: str = None, to_date: str = None,
+                 **params) -> List[Dict]:
+        params.update({'league': league_id, 'season': season})
+        if from_date:
+            params['from'] = from_date
+        if to_date:
+            params['to'] = to_date
+        return self.get('fixtures', params)
+
+    def injuries(self, league_id: int, season: int, **params) -> List[Dict]:
+        params.update({'league': league_id, 'season': season})
+        return self.get('injuries', params)
+
+    def standings(self, league_id: int, season: int) -> List[Dict]:
+        return self.get('standings', {'league': league_id, 'season': season})
+
+    def _track_rate_limit(self, response):
+        """
+        Record quota headers, stop calling upstream once a quota is spent or
+        a 429 says to back off, and keep the token bucket within the reported
+        per-minute limit
+        """
+        headers = response.headers
+        if response.status_code == 429:
+            retry_after = _retry_after_seconds(headers.get('Retry-After'))
+            with self._lock:
+                self._blocked_until = max(self._blocked_until, time.time() + retry_after)
+        limits = {
+            'daily_limit': headers.get('x-ratelimit-requests-limit'),
+            'daily_remaining': headers.get('x-ratelimit-requests-remaining'),
+            'minute_limit': headers.get('X-RateLimit-Limit'),
+            'minute_remaining': headers.get('X-RateLimit-Remaining'),
+        }
+        limits = {key: int(value) for key, value in limits.items() if value is not None and value.isdigit()}
+        if not limits:
+            return
+
+        blocked_until = 0.0
+        if limits.get('daily_remaining') == 0:
+            # Daily quota resets at midnight UTC
+            tomorrow = datetime.now(timezone.utc).date() + timedelta(days=1)
+            blocked_until = datetime(tomorrow.year, tomorrow.month, tomorrow.day,
+                                     tzinfo=timezone.utc).timestamp()
+        elif limits.get('minute_remaining') == 0:
+            blocked_until = time.time() + 60
+
+        with self._lock:
+            self.rate_limit = limits
+            self._blocked_until = max(self._blocked_until, blocked_until)
+
+        # Never plan on more than upstream says the key allows
+        minute_limit = limits.get('minute_limit')
+        self.bucket.limit(rate=minute_limit / 60 if minute_limit else None,
+                          available=limits.get('minute_remaining'))
+
+    def stats(self) -> Dict:
+        return {
+            'circuit': self.breaker.state,
+            'consecutive_failures': self.breaker.failures,
+            'circuit_opened': self.breaker.opened,
+            'requests_per_minute': round(self.bucket.rate * 60, 1),
+            'tokens': round(self.bucket.tokens, 2),
+            'rate_limit': self.rate_limit,
+        }
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+
+
+class RecordedApiClient(ApiSportsClient):
+    """
+    Offline stand-in that answers from recorded `response` lists stored as
+    <directory>/<path>/<sorted query>.json, e.g. injuries/league=39&season=2025.json.
+    Given a live client, missing recordings are fetched and saved.
+    """
+
+    def __init__(self, directory: str, live: ApiSportsClient = None):
+        self.directory = directory
+        self.live = live
+        self.rate_limit = {}
+        self.requests = 0
+
+    def recording_path(self, path: str, params: Dict = None) -> str:
+        query = urlencode(sorted((params or {}).items())) or 'index'
+        return os.path.join(self.directory, path.strip('/'), f"{query}.json")
+
+    def get(self, path: str, params: Dict = None) -> List[Dict]:
+        self.requests += 1
+        filename = self.recording_path(path, params)
+        if os.path.exists(filename):
+            with open(filename, encoding='utf-8') as f:
+                return json.load(f)
+        if self.live is None:
+            raise ApiSportsError(f"No recording for {path} {params or {}}", status=404)
+
+        response = self.live.get(path, params)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump(response, f, indent=2, ensure_ascii=False)
+        return response
+
+    def stats(self) -> Dict:
+        return {'recordings': self.directory, 'requests': self.requests,
+                'live': self.live.stats() if self.live is not None else None}
+
+    def close(self):
+        if self.live is not None:
+            self.live.close()
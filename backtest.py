@@ -0,0 +1,202 @@
+"""
+Historical backtesting for the Football Predictor
+Replays past fixtures as of each match date and scores the predictions
+(accuracy, Brier score, log-loss) per league and season, sharded across
+a process pool. Team ratings are updated from each matchday's results
+before the next one is predicted.
+
+Usage:
+    python backtest.py history.csv --workers 8 --output backtest.json
+
+Input columns (CSV or Parquet):
+    date, league, season, home_team, away_team, home_goals, away_goals
+    optional: fixture_id, home_team_id, away_team_id
+"""
+
+import argparse
+import csv
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from typing import Dict, List
+
+import numpy as np
+
+from ratings import RatingEngine
+
+OUTCOMES = ('Home Win', 'Draw', 'Away Win')
+REQUIRED_COLUMNS = ('date', 'league', 'season', 'home_team', 'away_team', 'home_goals', 'away_goals')
+EPSILON = 1e-6
+
+_worker_predictor = None
+
+
+def load_matches(path: str) -> List[Dict]:
+    """Read historical results from a .csv or .parquet file"""
+    if path.endswith('.parquet'):
+        try:
+            import pandas as pd
+        except ImportError as e:
+            raise ImportError("Reading Parquet needs pandas + pyarrow: pip install pandas pyarrow") from e
+        rows = pd.read_parquet(path).to_dict('records')
+    else:
+        with open(path, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+
+    if rows:
+        missing = [column for column in REQUIRED_COLUMNS if column not in rows[0]]
+        if missing:
+            raise ValueError(f"{path} is missing columns: {', '.join(missing)}")
+
+    matches = []
+    for row in rows:
+        matches.append({
+            'date': str(row['date'])[:10],
+            'league': str(row['league']),
+            'season': str(row['season']),
+            'home_team': row['home_team'],
+            'away_team': row['away_team'],
+            'home_goals': int(row['home_goals']),
+            'away_goals': int(row['away_goals']),
+            'fixture_id': _optional_int(row.get('fixture_id')),
+            'home_team_id': _optional_int(row.get('home_team_id')),
+            'away_team_id': _optional_int(row.get('away_team_id')),
+        })
+    return matches
+
+
+def _optional_int(value):
+    if value is None or value == '' or (isinstance(value, float) and np.isnan(value)):
+        return None
+    return int(value)
+
+
+def _init_worker():
+    """Build one predictor per worker process; historical injuries are unknown"""
+    global _worker_predictor
+    from predictor import FootballPredictor
+    _worker_predictor = FootballPredictor(deterministic=True)
+    _worker_predictor.set_injuries({})
+
+
+def replay_shard(matches: List[Dict]) -> Dict:
+    """
+    Replay one (league, season) in date order. Each matchday is predicted as
+    a batch using only what the predictor knew before that date, then its
+    results are fed to the rating engine.
+    Returns summed metrics so shards can be merged.
+    """
+    if _worker_predictor is None:
+        _init_worker()
+    predictor = _worker_predictor
+    engine = RatingEngine()
+
+    probs = []
+    actual = []
+    for _, day in groupby(sorted(matches, key=lambda m: m['date']), key=lambda m: m['date']):
+        day = list(day)
+        predictor.set_ratings(engine.snapshot())
+        preds = predictor.predict_pairs(
+            [m['home_team'] for m in day],
+            [m['away_team'] for m in day],
+            [m['home_team_id'] for m in day],
+            [m['away_team_id'] for m in day],
+            fixture_ids=[m['fixture_id'] for m in day],
+        )
+        probs.extend((p['home_win_prob'], p['draw_prob'], p['away_win_prob']) for p in preds)
+        actual.extend(_outcome(m) for m in day)
+        engine.apply(day)
+
+    return score(np.array(probs, dtype=np.float64).reshape(-1, 3), np.array(actual, dtype=np.int64))
+
+
+def _outcome(match: Dict) -> int:
+    """Index into OUTCOMES"""
+    if match['home_goals'] > match['away_goals']:
+        return 0
+    if match['home_goals'] == match['away_goals']:
+        return 1
+    return 2
+
+
+def score(probs: np.ndarray, actual: np.ndarray) -> Dict:
+    """
+    Summed metrics for an (n, 3) array of home/draw/away probabilities
+    (any scale; rows are normalized) against actual outcome indices
+    """
+    n = len(actual)
+    if n == 0:
+        return {'matches': 0, 'correct': 0, 'brier_sum': 0.0, 'log_loss_sum': 0.0}
+    probs = probs / probs.sum(axis=1, keepdims=True)
+    onehot = np.zeros_like(probs)
+    onehot[np.arange(n), actual] = 1.0
+    p_actual = np.clip(probs[np.arange(n), actual], EPSILON, 1.0)
+    return {
+        'matches': n,
+        'correct': int((probs.argmax(axis=1) == actual).sum()),
+        'brier_sum': float(((probs - onehot) ** 2).sum()),
+        'log_loss_sum': float(-np.log(p_actual).sum()),
+    }
+
+
+def summarize(totals: Dict) -> Dict:
+    n = totals['matches']
+    return {
+        'matches': n,
+        'accuracy': round(totals['correct'] / n, 4) if n else None,
+        'brier': round(totals['brier_sum'] / n, 4) if n else None,
+        'log_loss': round(totals['log_loss_sum'] / n, 4) if n else None,
+    }
+
+
+def run_backtest(matches: List[Dict], workers: int = None) -> Dict:
+    """Shard by (league, season), replay shards in parallel and merge the metrics"""
+    shards = defaultdict(list)
+    for match in matches:
+        shards[(match['league'], match['season'])].append(match)
+    keys = sorted(shards)
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(keys) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(keys)), initializer=_init_worker) as pool:
+            results = list(pool.map(replay_shard, [shards[key] for key in keys]))
+    else:
+        results = [replay_shard(shards[key]) for key in keys]
+
+    overall = {'matches': 0, 'correct': 0, 'brier_sum': 0.0, 'log_loss_sum': 0.0}
+    by_league = defaultdict(lambda: dict(overall))
+    report = {'shards': []}
+    for (league, season), totals in zip(keys, results):
+        report['shards'].append({'league': league, 'season': season, **summarize(totals)})
+        for bucket in (overall, by_league[league]):
+            for metric, value in totals.items():
+                bucket[metric] += value
+
+    report['leagues'] = {league: summarize(totals) for league, totals in sorted(by_league.items())}
+    report['overall'] = summarize(overall)
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Backtest predictions against historical results')
+    parser.add_argument('path', help='CSV or Parquet file of past results')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='processes (default: all cores)')
+    parser.add_argument('-o', '--output', help='write the full report as JSON')
+    args = parser.parse_args()
+
+    report = run_backtest(load_matches(args.path), args.workers)
+
+    print("📈 Backtest results\n")
+    print(f"{'League':<24}{'Season':<10}{'Matches':>8}{'Acc':>8}{'Brier':>8}{'LogLoss':>9}")
+    for shard in report['shards']:
+        print(f"{shard['league']:<24}{shard['season']:<10}{shard['matches']:>8}"
+              f"{shard['accuracy']:>8}{shard['brier']:>8}{shard['log_loss']:>9}")
+    overall = report['overall']
+    print(f"\n✅ {overall['matches']} matches • accuracy {overall['accuracy']} • "
+          f"Brier {overall['brier']} • log-loss {overall['log_loss']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
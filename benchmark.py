@@ -0,0 +1,412 @@
+"""
+Benchmarks for the Football Predictor
+Prediction throughput (single vs batch), memory per 10k predictions and
+fixtures (upstream dicts vs the columnar FixtureBatch), API
+latency under concurrent load against the local mock upstream, and api.py
+startup time (cold and from a snapshot, checked against a budget). Results
+can be written as JSON and compared across commits.
+
+Usage:
+    python benchmark.py -o bench.json
+    python benchmark.py --only predict,api -c 16 --compare bench.json
+    python benchmark.py --only api --synthetic leagues=200,teams=20
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import numpy as np
+import requests
+
+from fixtures import FixtureBatch
+from predictor import FootballPredictor
+from teams import TEAMS
+
+SUITES = ('predict', 'memory', 'api', 'import')
+
+# Metrics compared by --compare, and whether bigger is better
+KEY_METRICS = {
+    ('predict', 'single_per_sec'): True,
+    ('predict', 'batch_per_sec'): True,
+    ('memory', 'peak_bytes_per_10k'): False,
+    ('memory', 'fixtures', 'batch_bytes_per_10k'): False,
+    ('api', 'predictions', 'p50_ms'): False,
+    ('api', 'predictions', 'p99_ms'): False,
+    ('api', 'predict', 'p50_ms'): False,
+    ('api', 'predict', 'p99_ms'): False,
+    ('import', 'import_seconds'): False,
+    ('import', 'snapshot_ready_seconds'): False,
+}
+
+# Default for --startup-budget: seconds from process start to ready, with a snapshot
+STARTUP_BUDGET = float(os.getenv('STARTUP_BUDGET_SECONDS', 0.5))
+
+
+def make_pairs(n: int, seed: int = 0):
+    """Random (home, away) name lists drawn from the rating table"""
+    rng = random.Random(seed)
+    teams = list(TEAMS.names) + ['Unknown FC']
+    homes = [rng.choice(teams) for _ in range(n)]
+    aways = [rng.choice(teams) for _ in range(n)]
+    return homes, aways
+
+
+def bench_predict(n: int = 10000, repeat: int = 3, seed: int = 42):
+    """Time single vs batch prediction and check both give identical output"""
+    predictor = FootballPredictor()
+    homes, aways = make_pairs(n)
+
+    single_best = batch_best = float('inf')
+    for _ in range(repeat):
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        single = [predictor.predict_match(h, a, rng=rng) for h, a in zip(homes, aways)]
+        single_best = min(single_best, time.perf_counter() - start)
+
+        rng = random.Random(seed)
+        start = time.perf_counter()
+        batch = predictor.predict_pairs(homes, aways, rng=rng)
+        batch_best = min(batch_best, time.perf_counter() - start)
+
+    return {
+        'fixtures': n,
+        'single_seconds': round(single_best, 4),
+        'batch_seconds': round(batch_best, 4),
+        'single_per_sec': round(n / single_best),
+        'batch_per_sec': round(n / batch_best),
+        'speedup': round(single_best / batch_best, 2),
+        'identical': single == batch,
+    }
+
+
+def bench_memory(n: int = 10000, seed: int = 42):
+    """
+    Python heap for one batch of n predictions: peak while predicting and
+    what the returned dicts keep alive, scaled to per 10k
+    """
+    predictor = FootballPredictor()
+    homes, aways = make_pairs(n)
+    predictor.predict_pairs(homes[:100], aways[:100], rng=random.Random(seed))  # warm lazy imports
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    preds = predictor.predict_pairs(homes, aways, rng=random.Random(seed))
+    _, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    retained = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    scale = 10000 / n
+    return {
+        'fixtures': len(preds),
+        'peak_bytes_per_10k': round(peak * scale),
+        'retained_bytes_per_10k': round(retained * scale),
+    }
+
+
+def bench_fixture_memory(n: int = 10000):
+    """
+    What n upstream fixtures keep alive once decoded: the api-sports dicts
+    as the JSON client returns them vs one FixtureBatch parsed from them
+    """
+    from datetime import timedelta
+
+    from synthetic import EPOCH, SyntheticData
+
+    # One full season is 380 fixtures per 20-team league
+    data = SyntheticData(leagues=-(-n // 380))
+    season_end = (EPOCH + timedelta(weeks=40)).isoformat()
+    matches = [match for league_id in data.league_ids
+               for match in data.fixtures(league_id, from_date=EPOCH.isoformat(), to_date=season_end)][:n]
+    body = json.dumps(matches)
+    del matches
+
+    def retained(build):
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+        value = build()
+        size = tracemalloc.get_traced_memory()[0] - before
+        tracemalloc.stop()
+        return value, size
+
+    dicts, dict_bytes = retained(lambda: json.loads(body))
+    start = time.perf_counter()
+    FixtureBatch.from_api(dicts)
+    parse_seconds = time.perf_counter() - start
+    del dicts
+    batch, batch_bytes = retained(lambda: FixtureBatch.from_api(json.loads(body)))
+
+    scale = 10000 / len(batch)
+    return {
+        'fixtures': len(batch),
+        'dict_bytes_per_10k': round(dict_bytes * scale),
+        'batch_bytes_per_10k': round(batch_bytes * scale),
+        'reduction': round(dict_bytes / batch_bytes, 1),
+        'parse_seconds': round(parse_seconds, 4),
+    }
+
+
+def _latency_summary(samples, wall: float):
+    ms = np.array(samples) * 1000
+    return {
+        'requests': len(samples),
+        'p50_ms': round(float(np.percentile(ms, 50)), 2),
+        'p90_ms': round(float(np.percentile(ms, 90)), 2),
+        'p99_ms': round(float(np.percentile(ms, 99)), 2),
+        'max_ms': round(float(ms.max()), 2),
+        'requests_per_sec': round(len(samples) / wall, 1),
+    }
+
+
+def _load(concurrency: int, total: int, send):
+    """Run `send(session, i)` total times across `concurrency` threads; returns latencies"""
+    local = threading.local()
+
+    def one(i):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        start = time.perf_counter()
+        response = send(session, i)
+        elapsed = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code}: {response.text[:200]}")
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(one, range(total)))
+    return samples, time.perf_counter() - start
+
+
+def bench_api(concurrency: int = 8, total: int = 500, upstream_delay: float = 0.0, seed: int = 42,
+              synthetic: str = None):
+    """
+    p50/p99 latency of /predictions and /predict served by the threaded
+    werkzeug server, with api-sports replaced by the local mock upstream
+    and the stores in a temporary directory. With a `synthetic` spec the
+    upstream serves that many leagues and /predictions cycles through them.
+    """
+    from werkzeug.serving import make_server
+
+    from mock_upstream import start_mock_upstream
+    from synthetic import SyntheticData
+
+    data = SyntheticData.from_spec(synthetic) if synthetic else None
+    league_ids = data.league_ids if data else [39]
+    upstream = start_mock_upstream(delay=upstream_delay, synthetic=data)
+    workdir = tempfile.mkdtemp(prefix='football-bench-')
+    os.environ.update({
+        'FOOTBALL_API_BASE_URL': f"http://127.0.0.1:{upstream.server_port}",
+        'PREDICTION_STORE_PATH': os.path.join(workdir, 'predictions.db'),
+        'RATINGS_STORE_PATH': os.path.join(workdir, 'ratings.db'),
+        'PREDICTION_LEAGUES': ','.join(map(str, league_ids)),
+    })
+    import api
+
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', 0, api.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        # Fill the fixture cache and prediction store first
+        start = time.perf_counter()
+        api.warm_caches()
+        warm_seconds = time.perf_counter() - start
+
+        samples, wall = _load(concurrency, total, lambda session, i: session.get(
+            f"{base}/predictions", params={'league': league_ids[i % len(league_ids)]}))
+        predictions = _latency_summary(samples, wall)
+
+        homes, aways = make_pairs(total, seed)
+        samples, wall = _load(concurrency, total, lambda session, i: session.post(
+            f"{base}/predict", json={'home_team': homes[i], 'away_team': aways[i]}))
+        predict = _latency_summary(samples, wall)
+    finally:
+        server.shutdown()
+        upstream.shutdown()
+
+    return {
+        'concurrency': concurrency,
+        'upstream_delay': upstream_delay,
+        'leagues': len(league_ids),
+        'warm_seconds': round(warm_seconds, 4),
+        'predictions': predictions,
+        'predict': predict,
+    }
+
+
+def _time_startup(env: dict, repeat: int):
+    """Best fresh-interpreter times for `import api` and for import plus warm_caches()"""
+    code = ("import time; t = time.perf_counter(); import api; i = time.perf_counter() - t; "
+            "api.warm_caches(); print(i, time.perf_counter() - t)")
+    here = os.path.dirname(os.path.abspath(__file__))
+    import_best = ready_best = process_best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', code], cwd=here, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        process_best = min(process_best, time.perf_counter() - start)
+        import_seconds, ready_seconds = map(float, output.strip().splitlines()[-1].split())
+        import_best = min(import_best, import_seconds)
+        ready_best = min(ready_best, ready_seconds)
+    return round(import_best, 4), round(ready_best, 4), round(process_best, 4)
+
+
+def bench_import(repeat: int = 3, upstream_delay: float = 0.2):
+    """
+    Fresh-interpreter startup: `import api` alone and until warm_caches()
+    returns (ready to serve), cold and from a snapshot written by snapshot.py.
+    The mock upstream answers after `upstream_delay`, as a real one would.
+    """
+    from mock_upstream import start_mock_upstream
+
+    upstream = start_mock_upstream(delay=upstream_delay)
+    workdir = tempfile.mkdtemp(prefix='football-bench-')
+    snapshot = os.path.join(workdir, 'snapshot.bin')
+    env = dict(os.environ,
+               FOOTBALL_API_BASE_URL=f"http://127.0.0.1:{upstream.server_port}",
+               PREDICTION_STORE_PATH=os.path.join(workdir, 'predictions.db'),
+               RATINGS_STORE_PATH=os.path.join(workdir, 'ratings.db'),
+               SNAPSHOT_PATH=os.path.join(workdir, 'missing.bin'))
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        import_cold, ready_cold, process_cold = _time_startup(env, repeat)
+        subprocess.run([sys.executable, 'snapshot.py', '-o', snapshot], cwd=here, env=env,
+                       capture_output=True, check=True)
+        import_snap, ready_snap, _ = _time_startup(dict(env, SNAPSHOT_PATH=snapshot), repeat)
+    finally:
+        upstream.shutdown()
+
+    return {
+        'import_seconds': import_cold,
+        'ready_seconds': ready_cold,
+        'process_seconds': process_cold,
+        'snapshot_import_seconds': import_snap,
+        'snapshot_ready_seconds': ready_snap,
+        'snapshot_bytes': os.path.getsize(snapshot),
+    }
+
+
+def environment():
+    """Where the numbers came from"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = None
+    return {
+        'commit': commit or None,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def _lookup(report, path):
+    for key in path:
+        if not isinstance(report, dict) or key not in report:
+            return None
+        report = report[key]
+    return report
+
+
+def compare(old: dict, new: dict):
+    """Print the change in each key metric; + is better, - is worse"""
+    print(f"\n🔁 Compared with {old.get('environment', {}).get('commit') or 'baseline'}")
+    for path, higher_is_better in KEY_METRICS.items():
+        before, after = _lookup(old, path), _lookup(new, path)
+        if not before or after is None:
+            continue
+        change = (after - before) / before * 100
+        better = change if higher_is_better else -change
+        mark = '✅' if better >= -5 else '⚠️'
+        print(f"   {mark} {'.'.join(path):<28}{before:>12} → {after:<12}({better:+.1f}%)")
+
+
+def run(suites, fixtures: int, repeat: int, concurrency: int, total: int, upstream_delay: float,
+        synthetic: str = None) -> dict:
+    report = {'environment': environment()}
+    if 'predict' in suites:
+        result = report['predict'] = bench_predict(fixtures, repeat)
+        print(f"⚡ {result['fixtures']} fixtures")
+        print(f"   predict_match: {result['single_seconds']}s ({result['single_per_sec']}/s)")
+        print(f"   predict_pairs: {result['batch_seconds']}s ({result['batch_per_sec']}/s)")
+        print(f"   Speedup: {result['speedup']}x • identical output: {result['identical']}")
+    if 'memory' in suites:
+        result = report['memory'] = bench_memory(fixtures)
+        print(f"🧠 Memory per 10k predictions: peak {result['peak_bytes_per_10k'] / 1e6:.1f} MB, "
+              f"retained {result['retained_bytes_per_10k'] / 1e6:.1f} MB")
+        result = result['fixtures'] = bench_fixture_memory(fixtures)
+        print(f"   Per 10k fixtures: upstream dicts {result['dict_bytes_per_10k'] / 1e6:.1f} MB, "
+              f"FixtureBatch {result['batch_bytes_per_10k'] / 1e6:.2f} MB ({result['reduction']}x smaller, "
+              f"parsed in {result['parse_seconds']}s)")
+    if 'api' in suites:
+        result = report['api'] = bench_api(concurrency, total, upstream_delay, synthetic=synthetic)
+        print(f"🌐 API, {concurrency} concurrent clients, {result['leagues']} league(s) "
+              f"warmed in {result['warm_seconds']}s")
+        for name in ('predictions', 'predict'):
+            stats = result[name]
+            print(f"   /{name:<12} p50 {stats['p50_ms']}ms • p99 {stats['p99_ms']}ms • "
+                  f"{stats['requests_per_sec']} req/s")
+    if 'import' in suites:
+        result = report['import'] = bench_import(repeat)
+        print(f"🚀 import api: {result['import_seconds']}s, ready {result['ready_seconds']}s "
+              f"(process {result['process_seconds']}s)")
+        print(f"   from snapshot: import {result['snapshot_import_seconds']}s, "
+              f"ready {result['snapshot_ready_seconds']}s ({result['snapshot_bytes'] / 1024:.0f} KB)")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Football Predictor benchmark suite')
+    parser.add_argument('-n', '--fixtures', type=int, default=10000)
+    parser.add_argument('-r', '--repeat', type=int, default=3)
+    parser.add_argument('-c', '--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=500, help='requests per API endpoint')
+    parser.add_argument('--upstream-delay', type=float, default=0.0, help='mock upstream latency (s)')
+    parser.add_argument('--synthetic', metavar='SPEC',
+                        help='API suite against synthetic upstream data, e.g. leagues=200,teams=20')
+    parser.add_argument('--only', default=','.join(SUITES), help=f"comma-separated: {', '.join(SUITES)}")
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET,
+                        help='fail if startup from a snapshot takes longer (seconds, import suite)')
+    parser.add_argument('-o', '--output', help='write results as JSON')
+    parser.add_argument('--compare', metavar='JSON', help='earlier results to compare against')
+    args = parser.parse_args()
+
+    suites = [suite.strip() for suite in args.only.split(',') if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"unknown suite(s): {', '.join(sorted(unknown))}")
+
+    report = run(suites, args.fixtures, args.repeat, args.concurrency, args.requests, args.upstream_delay,
+                 args.synthetic)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+    if 'import' in report:
+        ready = report['import']['snapshot_ready_seconds']
+        if ready > args.startup_budget:
+            print(f"\n❌ Startup {ready}s is over the {args.startup_budget}s budget")
+            sys.exit(1)
+        print(f"\n✅ Startup {ready}s is within the {args.startup_budget}s budget")
@@ -0,0 +1,266 @@
+"""
+Caching helpers for the Football Predictor
+TTL + LRU fixture cache with stale-while-revalidate refresh and coalesced
+misses, and a version-invalidated LRU memo for single-match predictions
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key: the first caller runs the
+    function, everyone arriving while it runs waits and gets its result (or
+    its exception). Nothing is kept once the call finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}  # key -> [done event, result, exception]
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [threading.Event(), None, None]
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+
+        try:
+            call[1] = fn()
+        except BaseException as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call[0].set()
+        return call[1]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'calls': self.calls, 'shared': self.shared, 'in_flight': len(self._calls)}
+
+
+class FixtureCache:
+    """
+    Size-bounded LRU cache with a time-to-live per entry.
+
+    Fresh entries are returned directly. Entries older than `ttl` but younger
+    than `ttl + stale_ttl` are returned immediately while a background thread
+    reloads them (stale-while-revalidate). Anything older is a miss and is
+    loaded synchronously, once: concurrent misses on a key share one load.
+    """
+
+    def __init__(self, ttl: float = 300, stale_ttl: float = 3600, max_entries: int = 128):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (stored_at, value)
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._flight = SingleFlight()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, loader: Callable[[], Any],
+            cacheable: Callable[[Any], bool] = None) -> Any:
+        """
+        Return the cached value for `key`, calling `loader()` to fill it.
+        Exceptions raised by `loader` on a miss propagate to the caller.
+        Loaded values failing `cacheable` are returned but never stored.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry[0]
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[1]
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self.stale_hits += 1
+                    self._schedule_refresh(key, loader, cacheable)
+                    return entry[1]
+            self.misses += 1
+
+        return self._flight.do(key, lambda: self._load(key, loader, cacheable))
+
+    def _load(self, key: Hashable, loader: Callable[[], Any], cacheable: Callable[[Any], bool] = None) -> Any:
+        value = loader()
+        if cacheable is None or cacheable(value):
+            self.set(key, value)
+        return value
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value and evict the least recently used entries"""
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key: Hashable = None):
+        """Drop one key, or everything when no key is given"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def dump(self) -> List[Tuple[Hashable, float, Any]]:
+        """(key, stored at as wall-clock time, value) per entry, oldest first"""
+        offset = time.time() - time.monotonic()
+        with self._lock:
+            return [(key, stored_at + offset, value) for key, (stored_at, value) in self._entries.items()]
+
+    def load(self, entries: List[Tuple[Hashable, float, Any]]) -> int:
+        """
+        Restore dumped entries, keeping their age; those already past the
+        stale window are skipped. Returns how many were loaded.
+        """
+        offset = time.time() - time.monotonic()
+        now = time.monotonic()
+        loaded = 0
+        with self._lock:
+            for key, stored_at, value in entries:
+                stored_at -= offset
+                if now - stored_at < self.ttl + self.stale_ttl:
+                    self._entries[key] = (stored_at, value)
+                    self._entries.move_to_end(key)
+                    loaded += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return loaded
+
+    def _schedule_refresh(self, key: Hashable, loader: Callable[[], Any], cacheable: Callable[[Any], bool] = None):
+        """Start a background reload unless one is already running (lock held)"""
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        thread = threading.Thread(target=self._refresh, args=(key, loader, cacheable), daemon=True)
+        thread.start()
+
+    def _refresh(self, key: Hashable, loader: Callable[[], Any], cacheable: Callable[[Any], bool] = None):
+        try:
+            value = loader()
+            if cacheable is not None and not cacheable(value):
+                raise ValueError("refreshed value is not cacheable")
+        except Exception as e:
+            # Keep serving the stale copy until the next attempt
+            with self._lock:
+                self.refresh_errors += 1
+            logger.warning("Background refresh failed for %s: %s", key, e)
+        else:
+            self.set(key, value)
+            with self._lock:
+                self.refreshes += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> Dict:
+        """Hit/miss/refresh counters"""
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'evictions': self.evictions,
+                'coalesced': self._flight.shared,
+                'hit_ratio': round((self.hits + self.stale_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+class PredictionMemo:
+    """
+    Bounded LRU memo for single-match predictions.
+
+    Every lookup carries the current data version (ratings, injuries); when
+    it differs from the version the memo was filled under, all entries are
+    dropped so nothing computed from old data is ever served.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Hashable, loader: Callable[[], Any]) -> Any:
+        """Memoized `loader()`; the returned object is shared, so do not mutate it"""
+        with self._lock:
+            if version != self._version:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._version = version
+            elif key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = loader()
+
+        with self._lock:
+            # Data may have changed while loading; only keep current results
+            if version == self._version:
+                self._entries[key] = value
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'version': list(self._version) if isinstance(self._version, tuple) else self._version,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+            }
@@ -0,0 +1,375 @@
+"""
+Pluggable prediction engines for the Football Predictor
+A PredictionEngine scores a batch of matchups. The EngineRegistry holds the
+engines a process knows, the active one serving traffic and an optional
+shadow: every batch the active engine predicts is also scored by the shadow
+on a background thread, off the request path, and divergences are logged.
+Engines load at runtime from "module:Class" specs. The active/shadow choice
+is kept in a small JSON state file that every worker re-reads when it
+changes, so a swap reaches all workers without a restart.
+"""
+
+import importlib
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Tuple
+
+import numpy as np
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+
+# Seconds between checks of the state file for swaps made by other workers
+SYNC_SECONDS = 1.0
+
+# Modules (and their submodules) engines may be loaded from
+ENGINE_MODULES = tuple(name.strip() for name in os.getenv('ENGINE_MODULES', 'predictor').split(',')
+                       if name.strip())
+
+# A shadow prediction diverges when it picks another outcome or any 1X2
+# probability is this many percentage points away from the active one
+DIVERGENCE_POINTS = 10.0
+
+SHADOW_PREDICTIONS = metrics.counter(
+    'football_shadow_predictions_total', 'Predictions scored by the shadow engine', ('engine',)
+)
+SHADOW_DIVERGENCES = metrics.counter(
+    'football_shadow_divergences_total', 'Shadow predictions that diverged from the active engine', ('engine',)
+)
+
+
+class Matchups(NamedTuple):
+    """Immutable input to an engine; shadows score the very same snapshot later"""
+    home_teams: List[str]
+    away_teams: List[str]
+    home_idx: np.ndarray          # rating table index per pair
+    away_idx: np.ndarray
+    draws: np.ndarray             # (n, DRAWS_PER_MATCH) uniforms; engines may ignore them
+    ratings: np.ndarray           # rating per table index
+    injuries: object              # InjuryState
+    fixture_ids: List[int]
+
+
+class PredictionEngine:
+    """
+    Base class for engines. Subclasses set `name` and `version` and implement
+    predict(). `version` seeds deterministic predictions and keys caches, so
+    change it whenever the engine's output changes.
+    """
+
+    name = 'engine'
+    version = '0'
+
+    def predict(self, matchups: Matchups) -> List[Dict]:
+        """One dict per matchup, in order, with the keys predict_match returns"""
+        raise NotImplementedError
+
+    def describe(self) -> Dict:
+        return {
+            'name': self.name,
+            'version': self.version,
+            'class': f"{type(self).__module__}:{type(self).__qualname__}",
+        }
+
+
+def load_engine(spec: str, reload: bool = False, allowed: Tuple[str, ...] = None) -> PredictionEngine:
+    """
+    Instantiate the engine class named by "module:Class". The module must be
+    in `allowed` (default ENGINE_MODULES) or a submodule of one, and nothing
+    but a PredictionEngine subclass is ever called. With reload, the module is
+    re-imported first, picking up code changed on disk.
+    Raises ValueError if it cannot be loaded.
+    """
+    module_name, _, class_name = spec.partition(':')
+    if not module_name or not class_name:
+        raise ValueError(f"Engine spec must look like module:Class, got {spec!r}")
+    allowed = ENGINE_MODULES if allowed is None else allowed
+    if not any(module_name == name or module_name.startswith(name + '.') for name in allowed):
+        raise ValueError(f"Engine module {module_name!r} is not in ENGINE_MODULES")
+    try:
+        module = importlib.import_module(module_name)
+        if reload:
+            module = importlib.reload(module)
+        engine_class = getattr(module, class_name)
+    except Exception as e:
+        raise ValueError(f"Cannot load engine {spec!r}: {e}") from e
+    if not (isinstance(engine_class, type) and issubclass(engine_class, PredictionEngine)):
+        raise ValueError(f"{spec} is not a PredictionEngine")
+    try:
+        return engine_class()
+    except Exception as e:
+        raise ValueError(f"Cannot load engine {spec!r}: {e}") from e
+
+
+class EngineRegistry:
+    """
+    Engines by name plus the active and shadow selection. Without a state
+    file, changes stay in this process.
+    """
+
+    def __init__(self, default: PredictionEngine, state_path: str = None,
+                 sample_rate: float = 1.0, max_pending: int = 8):
+        self._engines = {default.name: default}
+        self._specs = {}  # name -> "module:Class" for engines loaded at runtime
+        self.default = default
+        self.active = default
+        self.shadow = None
+        self.state_path = state_path
+        self._state_mtime = None
+        self._next_sync = 0.0
+        self._lock = threading.RLock()
+
+        # Shadow scoring: one background thread, a bounded backlog, sampling
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self._executor = None
+        self._pending = 0
+        self._sampler = random.Random()
+        self.divergences = deque(maxlen=50)
+        self._reset_shadow_stats()
+
+    def _reset_shadow_stats(self):
+        self.shadow_batches = 0
+        self.shadow_predictions = 0
+        self.shadow_divergences = 0
+        self.shadow_dropped = 0
+        self.shadow_errors = 0
+        self.shadow_seconds = 0.0
+        self.active_seconds = 0.0
+        self.probability_gap = 0.0  # summed mean absolute 1X2 gap, in points
+        self.divergences.clear()
+
+    def attach(self, state_path: str):
+        """Persist selections to `state_path` and adopt whatever it already holds"""
+        self.state_path = state_path
+        self._state_mtime = None
+        self.sync(force=True)
+
+    def register(self, engine: PredictionEngine, spec: str = None):
+        with self._lock:
+            self._engines[engine.name] = engine
+            if spec:
+                self._specs[engine.name] = spec
+
+    def load(self, spec: str, reload: bool = False) -> PredictionEngine:
+        """Load and register an engine from "module:Class"; nothing is swapped yet"""
+        engine = load_engine(spec, reload=reload)
+        with self._lock:
+            replaced = self._engines.get(engine.name)
+            self.register(engine, spec)
+            # A reloaded engine takes over the roles of the old instance
+            if replaced is not None and replaced is self.active:
+                self.active = engine
+            if replaced is not None and replaced is self.shadow:
+                self.shadow = engine
+            self._save()
+        logger.info("Loaded prediction engine %s %s from %s", engine.name, engine.version, spec)
+        return engine
+
+    def get(self, name: str) -> PredictionEngine:
+        with self._lock:
+            engine = self._engines.get(name)
+        if engine is None:
+            raise ValueError(f"Unknown engine {name!r}")
+        return engine
+
+    def activate(self, name: str) -> PredictionEngine:
+        """Serve traffic from the named engine"""
+        engine = self.get(name)
+        with self._lock:
+            self.active = engine
+            if self.shadow is engine:
+                self.shadow = None
+            self._save()
+        logger.info("Active prediction engine is now %s %s", engine.name, engine.version)
+        return engine
+
+    def set_shadow(self, name: str = None):
+        """Shadow-score live traffic with the named engine (None stops shadowing)"""
+        engine = self.get(name) if name else None
+        if engine is not None and engine is self.active:
+            raise ValueError(f"{name} is already the active engine")
+        with self._lock:
+            if engine is not self.shadow:
+                self._reset_shadow_stats()
+            self.shadow = engine
+            self._save()
+        logger.info("Shadow prediction engine is now %s", name or 'off')
+
+    def current(self) -> Tuple[PredictionEngine, PredictionEngine]:
+        """(active, shadow), first picking up swaps other workers made"""
+        if self.state_path and time.monotonic() >= self._next_sync:
+            self.sync()
+        return self.active, self.shadow
+
+    def _save(self):
+        """Write the selection to the state file, atomically (lock held)"""
+        if not self.state_path:
+            return
+        state = {
+            'engines': {name: {'spec': spec, 'version': self._engines[name].version}
+                        for name, spec in self._specs.items()},
+            'active': self.active.name,
+            'shadow': self.shadow.name if self.shadow else None,
+        }
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp, self.state_path)
+        self._state_mtime = os.stat(self.state_path).st_mtime_ns
+
+    def sync(self, force: bool = False):
+        """Adopt the state file's engines and selection if it changed since last seen"""
+        self._next_sync = time.monotonic() + SYNC_SECONDS
+        try:
+            mtime = os.stat(self.state_path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._state_mtime and not force:
+            return
+        with self._lock:
+            self._state_mtime = mtime
+            try:
+                with open(self.state_path) as f:
+                    state = json.load(f)
+                for name, entry in state.get('engines', {}).items():
+                    known = self._engines.get(name)
+                    if known is None or self._specs.get(name) != entry['spec'] or known.version != entry['version']:
+                        # Another worker loaded it, or reloaded newer code
+                        self.register(load_engine(entry['spec'], reload=known is not None), entry['spec'])
+                active = self._engines.get(state.get('active'), self.default)
+                shadow = self._engines.get(state.get('shadow'))
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                logger.warning("Ignoring engine state %s: %s", self.state_path, e)
+                return
+            if shadow is not self.shadow:
+                self._reset_shadow_stats()
+            self.active = active
+            self.shadow = shadow if shadow is not active else None
+
+    def predict(self, matchups: Matchups,
+                engines: Tuple[PredictionEngine, PredictionEngine] = None) -> List[Dict]:
+        """
+        Score with the active engine and queue the same batch for the shadow.
+        `engines` pins the (active, shadow) pair the caller already resolved.
+        """
+        active, shadow = engines or self.current()
+        if shadow is None:
+            return active.predict(matchups)
+
+        start = time.perf_counter()
+        preds = active.predict(matchups)
+        elapsed = time.perf_counter() - start
+        self._submit_shadow(shadow, active, matchups, preds, elapsed)
+        return preds
+
+    def _submit_shadow(self, shadow: PredictionEngine, active: PredictionEngine,
+                       matchups: Matchups, preds: List[Dict], active_seconds: float):
+        with self._lock:
+            if self._sampler.random() >= self.sample_rate:
+                return
+            if self._pending >= self.max_pending:
+                # Never let a slow candidate build an unbounded backlog
+                self.shadow_dropped += 1
+                return
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='shadow-engine')
+        self._executor.submit(self._score_shadow, shadow, active, matchups, preds, active_seconds)
+
+    def _score_shadow(self, shadow: PredictionEngine, active: PredictionEngine,
+                      matchups: Matchups, preds: List[Dict], active_seconds: float):
+        try:
+            start = time.perf_counter()
+            shadow_preds = shadow.predict(matchups)
+            elapsed = time.perf_counter() - start
+            gaps, diverged = compare_predictions(preds, shadow_preds)
+        except Exception as e:
+            with self._lock:
+                self._pending -= 1
+                self.shadow_errors += 1
+            logger.warning("Shadow engine %s failed: %s", shadow.name, e)
+            return
+
+        for i in diverged:
+            record = {
+                'fixture_id': matchups.fixture_ids[i] if matchups.fixture_ids else None,
+                'home_team': matchups.home_teams[i],
+                'away_team': matchups.away_teams[i],
+                'active': _outcome(preds[i]),
+                'shadow': _outcome(shadow_preds[i]),
+                'gap': round(float(gaps[i]), 1),
+            }
+            logger.info("Shadow divergence (%s vs %s): %s", active.name, shadow.name, record)
+            self.divergences.append(record)
+
+        SHADOW_PREDICTIONS.inc(len(preds), engine=shadow.name)
+        if diverged:
+            SHADOW_DIVERGENCES.inc(len(diverged), engine=shadow.name)
+        with self._lock:
+            self._pending -= 1
+            if shadow is not self.shadow:
+                return  # shadow changed while scoring; counters belong to the new one
+            self.shadow_batches += 1
+            self.shadow_predictions += len(preds)
+            self.shadow_divergences += len(diverged)
+            self.shadow_seconds += elapsed
+            self.active_seconds += active_seconds
+            self.probability_gap += float(gaps.sum()) if len(gaps) else 0.0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            compared = self.shadow_predictions
+            return {
+                'active': self.active.describe(),
+                'shadow': self.shadow.describe() if self.shadow else None,
+                'engines': [engine.describe() for engine in self._engines.values()],
+                'state_path': self.state_path,
+                'shadow_stats': {
+                    'batches': self.shadow_batches,
+                    'predictions': compared,
+                    'divergences': self.shadow_divergences,
+                    'divergence_rate': round(self.shadow_divergences / compared, 4) if compared else 0.0,
+                    'mean_probability_gap': round(self.probability_gap / compared, 2) if compared else 0.0,
+                    'active_seconds': round(self.active_seconds, 4),
+                    'shadow_seconds': round(self.shadow_seconds, 4),
+                    'pending': self._pending,
+                    'dropped': self.shadow_dropped,
+                    'errors': self.shadow_errors,
+                    'sample_rate': self.sample_rate,
+                },
+                'recent_divergences': list(self.divergences),
+            }
+
+
+def _outcome(pred: Dict) -> Dict:
+    return {
+        'prediction': pred['prediction'],
+        'probabilities': [pred['home_win_prob'], pred['draw_prob'], pred['away_win_prob']],
+    }
+
+
+def compare_predictions(active: List[Dict], shadow: List[Dict],
+                        threshold: float = DIVERGENCE_POINTS) -> Tuple[np.ndarray, List[int]]:
+    """
+    Mean absolute 1X2 gap (percentage points) per pair, and the positions
+    where the shadow picks another outcome or any probability is `threshold`
+    points or more away
+    """
+    if len(active) != len(shadow):
+        raise ValueError(f"Shadow returned {len(shadow)} predictions for {len(active)} matchups")
+    keys = ('home_win_prob', 'draw_prob', 'away_win_prob')
+    a = np.array([[pred[key] for key in keys] for pred in active], dtype=float).reshape(-1, 3)
+    s = np.array([[pred[key] for key in keys] for pred in shadow], dtype=float).reshape(-1, 3)
+    gap = np.abs(a - s)
+    picks = [x['prediction'] != y['prediction'] for x, y in zip(active, shadow)]
+    diverged = np.flatnonzero(np.array(picks, dtype=bool) | (gap.max(axis=1) >= threshold)).tolist()
+    return gap.mean(axis=1), diverged
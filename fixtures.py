@@ -0,0 +1,194 @@
+"""
+Compact fixtures for the Football Predictor
+Upstream api-sports fixtures are parsed once into a FixtureBatch: NumPy
+columns for IDs and rating-table indices, plain lists of interned strings
+for names, so a slate costs a handful of columns instead of five nested
+dicts per fixture. Indexing a batch gives a Fixture, a __slots__ record with
+just the fields the predictor, the prediction store and the API read.
+"""
+
+import sys
+from typing import Dict, Iterator, List, Sequence, Union
+
+import numpy as np
+
+from teams import TEAMS
+
+# Record fields, in storage order
+FIELDS = ('id', 'date', 'league', 'flag', 'venue',
+          'home', 'away', 'home_id', 'away_id', 'home_logo', 'away_logo')
+
+
+def _intern(value):
+    # Team, league and venue names repeat across a slate; keep one copy each
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _ids(values: Sequence[int]) -> np.ndarray:
+    """IDs as int64, 0 standing in for a missing one"""
+    return np.array([value or 0 for value in values], dtype=np.int64)
+
+
+def _id_list(values: np.ndarray) -> List[int]:
+    return [value or None for value in values.tolist()]
+
+
+class Fixture:
+    """One upcoming fixture"""
+
+    __slots__ = FIELDS
+
+    def __init__(self, id: int, date: str, league: str, flag: str, venue: str,
+                 home: str, away: str, home_id: int = None, away_id: int = None,
+                 home_logo: str = '', away_logo: str = ''):
+        self.id = id
+        self.date = date
+        self.league = league
+        self.flag = flag
+        self.venue = venue
+        self.home = home
+        self.away = away
+        self.home_id = home_id
+        self.away_id = away_id
+        self.home_logo = home_logo
+        self.away_logo = away_logo
+
+    @classmethod
+    def from_api(cls, match: Dict) -> 'Fixture':
+        """Parse one api-sports /fixtures entry"""
+        fixture = match['fixture']
+        league = match.get('league') or {}
+        home, away = match['teams']['home'], match['teams']['away']
+        return cls(
+            fixture.get('id'), fixture['date'],
+            _intern(league.get('name', '')), _intern(league.get('flag', '')),
+            _intern((fixture.get('venue') or {}).get('name', 'Unknown')),
+            _intern(home['name']), _intern(away['name']), home.get('id'), away.get('id'),
+            _intern(home.get('logo', '')), _intern(away.get('logo', '')),
+        )
+
+    def to_record(self) -> Dict:
+        """Flat dict for storage; the inverse of from_record"""
+        return {field: getattr(self, field) for field in FIELDS}
+
+    @classmethod
+    def from_record(cls, record: Dict) -> 'Fixture':
+        # Rows stored before fixtures were compacted hold the upstream shape
+        if 'fixture' in record:
+            return cls.from_api(record)
+        return cls(**record)
+
+    def __repr__(self) -> str:
+        return f"Fixture({self.id}, {self.home!r} vs {self.away!r}, {self.date})"
+
+
+class FixtureBatch:
+    """
+    Column-oriented slate of fixtures. Team names are resolved to rating
+    table indices once, on parse, so predicting a batch does no lookups.
+    """
+
+    __slots__ = ('ids', 'dates', 'leagues', 'flags', 'venues', 'home', 'away',
+                 'home_ids', 'away_ids', 'home_logos', 'away_logos', 'home_idx', 'away_idx')
+
+    def __init__(self, ids: np.ndarray, dates: List[str], leagues: List[str], flags: List[str],
+                 venues: List[str], home: List[str], away: List[str],
+                 home_ids: np.ndarray, away_ids: np.ndarray,
+                 home_logos: List[str], away_logos: List[str],
+                 home_idx: np.ndarray = None, away_idx: np.ndarray = None):
+        self.ids = ids
+        self.dates = dates
+        self.leagues = leagues
+        self.flags = flags
+        self.venues = venues
+        self.home = home
+        self.away = away
+        self.home_ids = home_ids
+        self.away_ids = away_ids
+        self.home_logos = home_logos
+        self.away_logos = away_logos
+        self.home_idx = TEAMS.indices(home, _id_list(home_ids)) if home_idx is None else home_idx
+        self.away_idx = TEAMS.indices(away, _id_list(away_ids)) if away_idx is None else away_idx
+
+    @classmethod
+    def from_fixtures(cls, fixtures: Sequence[Fixture]) -> 'FixtureBatch':
+        return cls(
+            _ids([f.id for f in fixtures]), [f.date for f in fixtures],
+            [f.league for f in fixtures], [f.flag for f in fixtures], [f.venue for f in fixtures],
+            [f.home for f in fixtures], [f.away for f in fixtures],
+            _ids([f.home_id for f in fixtures]), _ids([f.away_id for f in fixtures]),
+            [f.home_logo for f in fixtures], [f.away_logo for f in fixtures],
+        )
+
+    @classmethod
+    def from_api(cls, matches: List[Dict]) -> 'FixtureBatch':
+        """Parse an api-sports /fixtures response"""
+        return cls.from_fixtures([Fixture.from_api(match) for match in matches])
+
+    @classmethod
+    def of(cls, fixtures: Union['FixtureBatch', Sequence[Fixture], List[Dict]]) -> 'FixtureBatch':
+        """A batch as is, or one built from Fixture records or api-sports dicts"""
+        if isinstance(fixtures, FixtureBatch):
+            return fixtures
+        if fixtures and isinstance(fixtures[0], Fixture):
+            return cls.from_fixtures(fixtures)
+        return cls.from_api(fixtures)
+
+    @classmethod
+    def concat(cls, batches: Sequence['FixtureBatch']) -> 'FixtureBatch':
+        """One batch of every fixture in `batches`, in order"""
+        if not batches:
+            return cls.from_fixtures([])
+
+        def join(column: str):
+            values = [getattr(batch, column) for batch in batches]
+            return np.concatenate(values) if isinstance(values[0], np.ndarray) else [v for part in values for v in part]
+
+        return cls(*(join(column) for column in cls.__slots__))
+
+    @property
+    def fixture_ids(self) -> List[int]:
+        return _id_list(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, i: int) -> Fixture:
+        return Fixture(
+            int(self.ids[i]) or None, self.dates[i], self.leagues[i], self.flags[i], self.venues[i],
+            self.home[i], self.away[i], int(self.home_ids[i]) or None, int(self.away_ids[i]) or None,
+            self.home_logos[i], self.away_logos[i],
+        )
+
+    def __iter__(self) -> Iterator[Fixture]:
+        # Bulk-convert the numeric columns once rather than per row
+        columns = zip(
+            self.fixture_ids, self.dates, self.leagues, self.flags, self.venues, self.home, self.away,
+            _id_list(self.home_ids), _id_list(self.away_ids), self.home_logos, self.away_logos,
+        )
+        return (Fixture(*row) for row in columns)
+
+    def take(self, positions: Sequence[int]) -> 'FixtureBatch':
+        """A new batch of the fixtures at `positions`"""
+        positions = np.asarray(positions, dtype=np.intp)
+        rows = positions.tolist()
+
+        def pick(column: List) -> List:
+            return [column[i] for i in rows]
+
+        return FixtureBatch(
+            self.ids[positions], pick(self.dates), pick(self.leagues), pick(self.flags), pick(self.venues),
+            pick(self.home), pick(self.away), self.home_ids[positions], self.away_ids[positions],
+            pick(self.home_logos), pick(self.away_logos), self.home_idx[positions], self.away_idx[positions],
+        )
+
+    def since(self, day: str) -> 'FixtureBatch':
+        """Fixtures on or after `day` (YYYY-MM-DD)"""
+        return self.take([i for i, date in enumerate(self.dates) if date[:10] >= day])
+
+    def until(self, day: str) -> 'FixtureBatch':
+        """Fixtures on or before `day` (YYYY-MM-DD)"""
+        return self.take([i for i, date in enumerate(self.dates) if date[:10] <= day])
+
+    def __repr__(self) -> str:
+        return f"FixtureBatch({len(self)} fixtures)"
@@ -0,0 +1,112 @@
+"""
+Gunicorn configuration for the Football Predictor API
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is imported once in the master (preload_app), so the team registry,
+rating tables and Poisson lookup table are built (or read from the startup
+snapshot, see snapshot.py) once and shared with every worker copy-on-write.
+Each worker then reopens its SQLite handles and warms its caches before
+taking traffic. Exactly one worker runs the background refresh scheduler and
+injury feed; ratings and injuries changed in any worker reach the others
+through their shared stores (see api.sync_shared_state). Workers save their
+metrics to METRICS_DIR, so /metrics reports the whole server whichever
+worker answers the scrape.
+
+Graceful reload: `kill -HUP <master pid>` replaces workers one generation at
+a time, letting in-flight requests finish (graceful_timeout). Because the app
+is preloaded, code changes need a full restart (or USR2 + WINCH).
+"""
+
+import fcntl
+import multiprocessing
+import os
+import tempfile
+import threading
+
+bind = f"0.0.0.0:{os.getenv('PORT', 5000)}"
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+# Requests mostly wait on SQLite or upstream I/O, so threads per worker pay off
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+preload_app = True
+
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# Recycle workers now and then to cap memory growth; jitter avoids all at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 10000))
+max_requests_jitter = max_requests // 10
+
+accesslog = '-'
+errorlog = '-'
+
+# Seconds a new worker may spend warming caches before serving anyway
+WARM_TIMEOUT = float(os.getenv('WARM_TIMEOUT', 30))
+
+# Where every worker saves its metrics for /metrics to add up
+METRICS_DIR = os.getenv('METRICS_DIR') or os.path.join(tempfile.gettempdir(), f"football-metrics-{os.getenv('PORT', 5000)}")
+
+_jobs_lock = None
+
+
+def on_starting(server):
+    import metrics
+
+    # Totals restart with the server, not with each worker
+    metrics.clear_directory(METRICS_DIR)
+
+
+def post_fork(server, worker):
+    global _jobs_lock
+    import api
+    import metrics
+
+    api.reopen_stores()
+    metrics.REGISTRY.attach(METRICS_DIR)
+
+    # Background jobs in one worker only: whoever holds the lock file runs
+    # them, and a replacement worker picks them up if that one dies
+    lock_path = os.getenv('BACKGROUND_JOBS_LOCK', f"{api.store.path}.jobs.lock")
+    handle = open(lock_path, 'a')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return
+    _jobs_lock = handle
+    api.start_background_jobs()
+    server.log.info("Worker %s runs the background jobs", worker.pid)
+
+
+def worker_exit(server, worker):
+    import metrics
+
+    # Counts since the last periodic save would otherwise be lost
+    metrics.REGISTRY.save()
+
+
+def child_exit(server, worker):
+    import metrics
+
+    # Keep the exited worker's counts in the totals
+    metrics.mark_process_dead(METRICS_DIR, worker.pid)
+
+
+def post_worker_init(worker):
+    import api
+
+    # Warm on a thread and keep heartbeating so a slow upstream cannot get
+    # the worker killed for missing the boot timeout
+    result = {}
+    thread = threading.Thread(target=lambda: result.update(api.warm_caches()), daemon=True)
+    thread.start()
+    waited = 0.0
+    while thread.is_alive() and waited < WARM_TIMEOUT:
+        thread.join(1.0)
+        waited += 1.0
+        worker.notify()
+    if thread.is_alive():
+        worker.log.warning("Worker %s still warming after %ss; serving anyway", worker.pid, WARM_TIMEOUT)
+    else:
+        worker.log.info("Worker %s warmed %s fixtures", worker.pid, sum(result.values()))
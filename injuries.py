@@ -0,0 +1,320 @@
+"""
+Injury feed for the Football Predictor
+Polls api-sports /injuries per league, applies only what changed since the
+last poll to a compact per-team index of absent players, and versions each
+team separately so caches invalidate only the matchups that changed. With a
+state file, processes not running the feed follow the one that does.
+"""
+
+import hashlib
+import logging
+import os
+import pickle
+import threading
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, Hashable, List, NamedTuple, Set, Tuple
+
+import numpy as np
+
+from teams import TEAMS, TeamRegistry
+
+logger = logging.getLogger(__name__)
+
+
+# Impact of a missing player in "key players" (1.0 = one full INJURY_PENALTY)
+TYPE_WEIGHTS = {'Missing Fixture': 1.0, 'Questionable': 0.5}
+
+# Per-player overrides, by api-sports player id or name
+PLAYER_WEIGHTS = {}
+
+# A player listed for a fixture this recent (or later) counts as out
+RECENT_DAYS = 3
+
+# Used until the live feed has polled successfully
+SAMPLE_INJURIES = {
+    'Manchester United': ['Casemiro', 'Lisandro Martinez'],
+    'Manchester City': ['Kevin De Bruyne'],
+    'Barcelona': ['Pedri'],
+    'Juventus': ['Paul Pogba'],
+    'Borussia Dortmund': ['Marco Reus'],
+}
+
+NO_INJURIES = '0'
+
+
+class InjuryState(NamedTuple):
+    """Immutable view of the index; swapped atomically on every change"""
+    impact: np.ndarray         # summed player weights per team index
+    counts: np.ndarray         # absent players per team index
+    players: Tuple             # names of absent players per team index
+    team_versions: Tuple       # content hash per team index
+    version: str               # hash over every team version
+
+
+class InjuryIndex:
+    """
+    Absent players per team, merged from any number of sources (one per
+    league feed, plus manual/sample data). Only teams touched by a change are
+    recomputed; the last slot is the shared unknown team and stays empty.
+    """
+
+    def __init__(self, registry: TeamRegistry = TEAMS):
+        self.registry = registry
+        self._sources = {}  # source -> {team index: {player key: (name, weight)}}
+        self._lock = threading.Lock()
+        size = len(registry) + 1
+        self.state = _freeze(
+            np.zeros(size), np.zeros(size, dtype=np.int16), ((),) * size, (NO_INJURIES,) * size
+        )
+
+    @classmethod
+    def from_dict(cls, injuries: Dict[str, List[str]], source: Hashable = 'manual',
+                  registry: TeamRegistry = TEAMS) -> 'InjuryIndex':
+        """Index a {team name: [player names]} mapping, every player at full weight"""
+        index = cls(registry)
+        entries = {}
+        for team, players in injuries.items():
+            idx = registry.by_name.get(team)
+            if idx is not None:
+                for player in players:
+                    entries.setdefault(idx, {})[player] = (player, PLAYER_WEIGHTS.get(player, 1.0))
+        index.replace_source(source, entries)
+        return index
+
+    def replace_source(self, source: Hashable, entries: Dict[int, Dict]) -> Set[int]:
+        """
+        Make `entries` ({team index: {player key: (name, weight)}}) the full
+        current list for one source. Only the difference from the previous
+        list is applied; returns the team indices whose absentees changed.
+        """
+        with self._lock:
+            previous = self._sources.get(source, {})
+            changed = {
+                idx for idx in set(previous) | set(entries)
+                if previous.get(idx) != entries.get(idx)
+            }
+            if entries:
+                self._sources[source] = entries
+            else:
+                self._sources.pop(source, None)
+            if changed:
+                self._rebuild(changed)
+        return changed
+
+    def remove_source(self, source: Hashable) -> Set[int]:
+        return self.replace_source(source, {})
+
+    def _rebuild(self, changed: Set[int]):
+        """Recompute the changed teams into a new state (lock held)"""
+        state = self.state
+        impact = state.impact.copy()
+        counts = state.counts.copy()
+        players = list(state.players)
+        team_versions = list(state.team_versions)
+        for idx in changed:
+            merged = {}
+            for entries in self._sources.values():
+                for key, (name, weight) in entries.get(idx, {}).items():
+                    # Listed by several leagues: the highest weight wins
+                    if key not in merged or weight > merged[key][1]:
+                        merged[key] = (name, weight)
+            ordered = sorted(merged.values())
+            impact[idx] = sum(weight for _, weight in ordered)
+            counts[idx] = len(ordered)
+            players[idx] = tuple(name for name, _ in ordered)
+            team_versions[idx] = (
+                hashlib.sha256(repr(ordered).encode()).hexdigest()[:8] if ordered else NO_INJURIES
+            )
+        self.state = _freeze(impact, counts, tuple(players), tuple(team_versions))
+
+    def dump(self) -> Tuple[Dict, InjuryState]:
+        """Every source's entries plus the current state, e.g. for a startup snapshot"""
+        with self._lock:
+            return dict(self._sources), self.state
+
+    def load(self, sources: Dict, state: InjuryState):
+        """Adopt a dump() from an index over the same registry without rebuilding"""
+        with self._lock:
+            self._sources = dict(sources)
+            self.state = state
+
+    def team_version(self, idx: int) -> str:
+        return self.state.team_versions[idx]
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        state = self.state
+        return {
+            name: list(state.players[idx])
+            for idx, name in enumerate(self.registry.names) if state.players[idx]
+        }
+
+
+def _freeze(impact, counts, players, team_versions) -> InjuryState:
+    impact.setflags(write=False)
+    counts.setflags(write=False)
+    version = hashlib.sha256(''.join(team_versions).encode()).hexdigest()[:12]
+    return InjuryState(impact, counts, players, team_versions, version)
+
+
+def parse_injuries(records: List[Dict], registry: TeamRegistry = TEAMS,
+                   today: date = None) -> Dict[int, Dict]:
+    """
+    api-sports /injuries records -> {team index: {player key: (name, weight)}}.
+    Records list a player per missed fixture; anything for a fixture older
+    than RECENT_DAYS is history, not a current absence.
+    """
+    cutoff = ((today or date.today()) - timedelta(days=RECENT_DAYS)).isoformat()
+    entries = {}
+    for record in records:
+        fixture_date = (record.get('fixture') or {}).get('date') or ''
+        if fixture_date[:10] < cutoff:
+            continue
+        team = record.get('team') or {}
+        idx = registry.index(team.get('name'), team.get('id'))
+        if idx == registry.unknown:
+            continue
+        player = record.get('player') or {}
+        name = player.get('name')
+        if not name:
+            continue
+        key = player.get('id') or name
+        weight = PLAYER_WEIGHTS.get(key, PLAYER_WEIGHTS.get(name, TYPE_WEIGHTS.get(player.get('type'), 1.0)))
+        team_entries = entries.setdefault(idx, {})
+        team_entries[key] = max(team_entries.get(key, (name, 0.0)), (name, weight), key=lambda e: e[1])
+    return entries
+
+
+class InjuryFeed:
+    """
+    Background thread polling /injuries for each league on an interval.
+    Each league is one source in the index; `on_change` receives the team
+    indices whose absentees changed after every poll that changed anything.
+    With `state_path`, each change is written there and sync() loads it into
+    processes where the feed is not running.
+    """
+
+    def __init__(self, client, index: InjuryIndex, league_ids: List[int], season: int = 2025,
+                 interval: float = 14400, on_change: Callable[[Set[int]], None] = None,
+                 state_path: str = None, sync_interval: float = 1.0):
+        self.client = client
+        self.index = index
+        self.league_ids = list(league_ids)
+        self.season = season
+        self.interval = interval
+        self.on_change = on_change
+        self.state_path = state_path
+        self.sync_interval = sync_interval
+        self._state_mtime = None
+        self._next_sync = 0.0
+        self.polls = 0
+        self.errors = 0
+        self.last_poll = None
+        self.last_changed = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._poll_lock = threading.Lock()
+
+    def poll(self, league_ids: List[int] = None) -> Set[int]:
+        """Fetch the given leagues now and apply the deltas; returns changed team indices"""
+        changed = set()
+        with self._poll_lock:
+            for league_id in league_ids or self.league_ids:
+                try:
+                    records = self.client.injuries(league_id, self.season)
+                except Exception as e:
+                    self.errors += 1
+                    logger.warning("Injury poll failed for league %s: %s", league_id, e)
+                    continue
+                changed |= self.index.replace_source(('league', league_id), parse_injuries(records, self.index.registry))
+                # Live data supersedes the built-in sample as soon as any arrives
+                changed |= self.index.remove_source('sample')
+            self.polls += 1
+            self.last_poll = time.time()
+            self.last_changed = sorted(self.index.registry.names[idx] for idx in changed)
+            if changed:
+                self._save()
+        if changed and self.on_change is not None:
+            self.on_change(changed)
+        return changed
+
+    def _save(self):
+        """Write the index to the state file, atomically (poll lock held)"""
+        if not self.state_path:
+            return
+        tmp_path = f"{self.state_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(self.index.dump(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.state_path)
+            self._state_mtime = os.stat(self.state_path).st_mtime_ns
+        except OSError as e:
+            logger.warning("Could not save injury state to %s: %s", self.state_path, e)
+
+    def sync(self, force: bool = False) -> bool:
+        """
+        Load the index another process's feed saved, at most every
+        sync_interval seconds; True when it changed. No-op while this
+        process runs the feed itself.
+        """
+        now = time.monotonic()
+        if not self.state_path or self.running or (not force and now < self._next_sync):
+            return False
+        self._next_sync = now + self.sync_interval
+        try:
+            mtime = os.stat(self.state_path).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._state_mtime:
+            return False
+        try:
+            with open(self.state_path, 'rb') as f:
+                sources, state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError) as e:
+            logger.warning("Ignoring injury state %s: %s", self.state_path, e)
+            return False
+        self._state_mtime = mtime
+        if state.version == self.index.state.version:
+            return False
+        self.index.load(sources, state)
+        return True
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='injury-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self):
+        self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                logger.exception("Injury feed failed: %s", e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'leagues': self.league_ids,
+            'polls': self.polls,
+            'errors': self.errors,
+            'last_poll': self.last_poll,
+            'last_changed': self.last_changed,
+            'version': self.index.state.version,
+        }
@@ -0,0 +1,391 @@
+"""
+Metrics for the Football Predictor
+Dependency-free counters, gauges and histograms rendered in the Prometheus
+text format, plus stage timers that can also report per request
+(Server-Timing) when profiling is switched on. Processes sharing a metrics
+directory (gunicorn workers) render the sum over all of them.
+"""
+
+import glob
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, List, Tuple
+
+# Seconds; covers sub-millisecond predictions up to slow upstream calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Stage -> seconds for the current request, when it asked to be profiled
+_profile = ContextVar('profile', default=None)
+
+# In a metrics directory: one file per live process, plus the folded totals
+# of processes that have exited
+ARCHIVE_FILE = 'archive.json'
+LOCK_FILE = '.lock'
+
+logger = logging.getLogger(__name__)
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic count per label set"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def snapshot(self) -> Dict[Tuple, float]:
+        with self._lock:
+            return dict(self._values)
+
+    def samples(self, values: Dict[Tuple, float] = None) -> List[str]:
+        items = sorted((self.snapshot() if values is None else values).items())
+        return [f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in items]
+
+
+class Gauge:
+    """
+    Value read at scrape time from `callback`, which returns a number, or a
+    {label values tuple: number} dict when the gauge has labels.
+    kind='counter' exposes running totals kept elsewhere (e.g. cache stats).
+    """
+
+    def __init__(self, name: str, help: str, callback: Callable, labels: Tuple[str, ...] = (),
+                 kind: str = 'gauge'):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.callback = callback
+
+    def snapshot(self) -> Dict[Tuple, float]:
+        values = self.callback()
+        if not self.labels:
+            values = {(): values}
+        return {key: value for key, value in values.items() if value is not None}
+
+    def samples(self, values: Dict[Tuple, float] = None, labels: Tuple[str, ...] = None) -> List[str]:
+        values = self.snapshot() if values is None else values
+        labels = self.labels if labels is None else labels
+        return [
+            f"{self.name}{_format_labels(labels, key)} {_format_value(value)}"
+            for key, value in sorted(values.items(), key=lambda item: [str(v) for v in item[0]])
+        ]
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram per label set"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # label values -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, '') for name in self.labels)
+        slot = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> Dict[Tuple, List]:
+        with self._lock:
+            return {key: list(series) for key, series in self._series.items()}
+
+    def samples(self, series_by_key: Dict[Tuple, List] = None) -> List[str]:
+        items = sorted((self.snapshot() if series_by_key is None else series_by_key).items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), series[:-1]):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(series[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """
+    Named metrics in registration order. Once attached to a directory,
+    render() adds up what every process sharing it saved: counters and
+    histograms are summed (exited processes included, so totals never go
+    back), gauges are listed per live process under a `worker` label.
+    """
+
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+        self.directory = None
+
+    def register(self, metric):
+        with self._lock:
+            # Re-registering a name (e.g. a module reloaded) keeps the first one
+            return self._metrics.setdefault(metric.name, metric)
+
+    def unregister(self, name: str):
+        with self._lock:
+            self._metrics.pop(name, None)
+
+    def attach(self, directory: str, interval: float = 1.0):
+        """
+        Share this process's metrics through `directory`, saving them every
+        `interval` seconds. Call it in each worker, after the fork.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        thread = threading.Thread(target=self._save_loop, args=(interval,), name='metrics-save', daemon=True)
+        thread.start()
+
+    def dump(self) -> Dict[str, Dict]:
+        """Current values per metric name, JSON-ready"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        dumped = {}
+        for metric in metrics:
+            try:
+                values = metric.snapshot()
+            except Exception as e:
+                logger.warning("Could not read metric %s: %s", metric.name, e)
+                continue
+            dumped[metric.name] = {'kind': metric.kind, 'values': [[list(key), value] for key, value in values.items()]}
+        return dumped
+
+    def save(self):
+        """Write this process's values to the directory now (also last thing before exiting)"""
+        if self.directory is None:
+            return
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        try:
+            _write_json(path, self.dump())
+        except OSError as e:
+            logger.warning("Could not save metrics to %s: %s", path, e)
+
+    def _save_loop(self, interval: float):
+        while True:
+            self.save()
+            time.sleep(interval)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        merged = self._merged() if self.directory else None
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            if merged is None:
+                lines.extend(metric.samples())
+            elif metric.kind == 'gauge':
+                lines.extend(metric.samples(merged.get(metric.name, {}), metric.labels + ('worker',)))
+            else:
+                lines.extend(metric.samples(merged.get(metric.name, {})))
+        return '\n'.join(lines) + '\n'
+
+    def _merged(self) -> Dict[str, Dict]:
+        """Every process's values per metric: this one live, the rest as last saved"""
+        pid = os.getpid()
+        processes, archive = read_directory(self.directory)
+        processes[pid] = self.dump()
+        merged = {}
+        for process, dumped in processes.items():
+            for name, entry in dumped.items():
+                values = merged.setdefault(name, {})
+                for key, value in entry['values']:
+                    if entry['kind'] == 'gauge':
+                        values[tuple(key) + (process,)] = value
+                    else:
+                        _add(values, tuple(key), value)
+        for name, entry in archive.get('metrics', {}).items():
+            values = merged.setdefault(name, {})
+            for key, value in entry['values']:
+                _add(values, tuple(key), value)
+        return merged
+
+
+def _add(values: Dict, key: Tuple, value):
+    current = values.get(key)
+    if current is None:
+        values[key] = list(value) if isinstance(value, list) else value
+    elif isinstance(value, list):
+        values[key] = [a + b for a, b in zip(current, value)]
+    else:
+        values[key] = current + value
+
+
+def _write_json(path: str, data):
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _read_json(path: str, default):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+@contextmanager
+def _directory_lock(directory: str, exclusive: bool):
+    import fcntl
+
+    with open(os.path.join(directory, LOCK_FILE), 'a') as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+
+
+def read_directory(directory: str) -> Tuple[Dict[int, Dict], Dict]:
+    """({pid: saved metrics} for live processes, archive of exited ones)"""
+    with _directory_lock(directory, exclusive=False):
+        archive = _read_json(os.path.join(directory, ARCHIVE_FILE), {})
+        processes = {
+            int(os.path.basename(path)[:-len('.json')]): _read_json(path, {})
+            for path in glob.glob(os.path.join(directory, '[0-9]*.json'))
+        }
+    return processes, archive
+
+
+def mark_process_dead(directory: str, pid: int):
+    """
+    Fold an exited process's counters and histograms into the archive and
+    drop its file (gunicorn's child_exit hook); its gauges go with it
+    """
+    path = os.path.join(directory, f"{pid}.json")
+    with _directory_lock(directory, exclusive=True):
+        dumped = _read_json(path, None)
+        if dumped is None:
+            return
+        archive = _read_json(os.path.join(directory, ARCHIVE_FILE), {'metrics': {}})
+        for name, entry in dumped.items():
+            if entry['kind'] == 'gauge':
+                continue
+            folded = archive['metrics'].setdefault(name, {'kind': entry['kind'], 'values': []})
+            values = {tuple(key): value for key, value in folded['values']}
+            for key, value in entry['values']:
+                _add(values, tuple(key), value)
+            folded['values'] = [[list(key), value] for key, value in values.items()]
+        # Under the lock, so a render sees the process either live or folded
+        _write_json(os.path.join(directory, ARCHIVE_FILE), archive)
+        os.remove(path)
+
+
+def clear_directory(directory: str):
+    """Forget every process's metrics, e.g. when the server starts"""
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        os.remove(path)
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, help: str, labels: Tuple[str, ...] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, help, labels))
+
+
+def histogram(name: str, help: str, labels: Tuple[str, ...] = (),
+              buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, help, labels, buckets))
+
+
+def gauge(name: str, help: str, callback: Callable, labels: Tuple[str, ...] = (),
+          kind: str = 'gauge') -> Gauge:
+    """Register a scrape-time gauge, replacing any earlier one of the same name"""
+    REGISTRY.unregister(name)
+    return REGISTRY.register(Gauge(name, help, callback, labels, kind))
+
+
+STAGE_SECONDS = histogram(
+    'football_stage_duration_seconds', 'Time spent in each request stage', ('stage',)
+)
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Time a hot-path stage into STAGE_SECONDS and, if the current request is
+    being profiled, into its Server-Timing breakdown
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        profile = _profile.get()
+        if profile is not None:
+            profile[name] = profile.get(name, 0.0) + elapsed
+
+
+def start_profile():
+    """Collect stage timings for the rest of this request"""
+    _profile.set({})
+
+
+def end_profile() -> Dict[str, float]:
+    """Stage timings collected since start_profile(), or None if not profiling"""
+    profile = _profile.get()
+    _profile.set(None)
+    return profile
+
+
+def server_timing(profile: Dict[str, float], total: float = None) -> str:
+    """Format stage timings as a Server-Timing header value (milliseconds)"""
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in profile.items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.2f}")
+    return ', '.join(parts)
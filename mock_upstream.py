@@ -0,0 +1,189 @@
+"""
+Local mock of the api-sports.io upstream
+Serves the built-in mock fixtures (or synthetic data at any scale) over HTTP
+so the API can be exercised offline, with optional latency and injected
+failures: HTTP 500s, 429s with a spent quota, api-sports `errors` payloads
+and hung requests
+
+Usage:
+    python mock_upstream.py --port 8001 --delay 0.3 --league-delay 39=1.0
+    python mock_upstream.py --synthetic leagues=200,teams=20 --jitter 0.2 --error-rate 0.05
+    FOOTBALL_API_BASE_URL=http://localhost:8001 python api.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlparse
+
+from predictor import FootballPredictor, LEAGUES
+from synthetic import SyntheticData
+
+
+# Mock fixtures carry league names only; give them api-sports IDs
+LEAGUE_IDS = {league['name']: league['id'] for league in LEAGUES}
+LEAGUE_IDS['World Cup 2026 Qualifiers'] = 1
+
+
+def mock_fixtures(league_id: int):
+    """Built-in mock fixtures for one league, with league IDs filled in"""
+    fixtures = []
+    for match in FootballPredictor._get_mock_matches():
+        match_league = LEAGUE_IDS.get(match['league']['name'])
+        if match_league == league_id:
+            match['league']['id'] = match_league
+            fixtures.append(match)
+    return fixtures
+
+
+class MockUpstreamHandler(BaseHTTPRequestHandler):
+    """
+    Answers /fixtures like api-sports from the built-in mock fixtures; every
+    other endpoint returns an empty list. With `synthetic` set, /fixtures and
+    /injuries come from that SyntheticData instead. Failure rates are
+    fractions of requests, drawn from one seeded generator.
+    """
+
+    delay = 0.0
+    jitter = 0.0
+    league_delays = {}
+    synthetic = None
+    error_rate = 0.0
+    rate_limit_rate = 0.0
+    api_error_rate = 0.0
+    hang_rate = 0.0
+    hang_seconds = 30.0
+    request_count = 0
+    _count_lock = threading.Lock()
+    _rng = random.Random(0)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        league_id = int(params.get('league', 0) or 0)
+
+        with self._count_lock:
+            MockUpstreamHandler.request_count += 1
+            roll, extra = self._rng.random(), self._rng.random() * self.jitter
+
+        time.sleep(self.league_delays.get(league_id, self.delay) + extra)
+
+        # One roll per request, split across the failure kinds in order
+        for failure, rate in (('error', self.error_rate), ('rate_limit', self.rate_limit_rate),
+                              ('api_error', self.api_error_rate), ('hang', self.hang_rate)):
+            if roll < rate:
+                break
+            roll -= rate
+        else:
+            failure = None
+
+        if failure == 'error':
+            self.send_json(500, {'message': 'Injected upstream error'})
+            return
+        if failure == 'rate_limit':
+            self.send_json(429, {'message': 'Too many requests'},
+                           {'X-RateLimit-Limit': '300', 'X-RateLimit-Remaining': '0'})
+            return
+        if failure == 'hang':
+            time.sleep(self.hang_seconds)
+
+        path = url.path.rstrip('/')
+        if self.synthetic is not None:
+            response = self.synthetic.response(path, params) if path in ('/fixtures', '/injuries') else []
+        elif path == '/fixtures':
+            response = mock_fixtures(league_id)
+        else:
+            response = []
+
+        self.send_json(200, {
+            'get': url.path.strip('/'),
+            'parameters': params,
+            'errors': {'requests': 'Injected api-sports error'} if failure == 'api_error' else [],
+            'results': len(response),
+            'response': response,
+        })
+
+    def send_json(self, status: int, payload: Dict, headers: Dict[str, str] = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up on a hung request
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_mock_upstream(port: int = 0, delay: float = 0.0, league_delays: Dict[int, float] = None,
+                        synthetic: SyntheticData = None, jitter: float = 0.0, error_rate: float = 0.0,
+                        rate_limit_rate: float = 0.0, api_error_rate: float = 0.0,
+                        hang_rate: float = 0.0, hang_seconds: float = 30.0,
+                        seed: int = 0) -> ThreadingHTTPServer:
+    """Start the mock in a daemon thread; returns the server (see server_port)"""
+    handler = type('Handler', (MockUpstreamHandler,), {
+        'delay': delay,
+        'jitter': jitter,
+        'league_delays': dict(league_delays or {}),
+        'synthetic': synthetic,
+        'error_rate': error_rate,
+        'rate_limit_rate': rate_limit_rate,
+        'api_error_rate': api_error_rate,
+        'hang_rate': hang_rate,
+        'hang_seconds': hang_seconds,
+        '_rng': random.Random(seed),
+    })
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Mock api-sports upstream')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--league-delay', action='append', default=[], metavar='LEAGUE=SECONDS',
+                        help='per-league delay, e.g. 39=1.5 (repeatable)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='up to this many extra seconds, at random')
+    parser.add_argument('--synthetic', metavar='SPEC',
+                        help='serve synthetic data, e.g. leagues=200,teams=20,seed=1 (see synthetic.py)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of requests answered 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0,
+                        help='fraction answered 429 with an exhausted per-minute quota')
+    parser.add_argument('--api-error-rate', type=float, default=0.0,
+                        help='fraction answered 200 with an api-sports `errors` field')
+    parser.add_argument('--hang-rate', type=float, default=0.0,
+                        help='fraction that stall for --hang-seconds (client timeouts)')
+    parser.add_argument('--hang-seconds', type=float, default=30.0)
+    parser.add_argument('--seed', type=int, default=0, help='seed for jitter and injected failures')
+    args = parser.parse_args()
+
+    delays = {}
+    for item in args.league_delay:
+        league, seconds = item.split('=', 1)
+        delays[int(league)] = float(seconds)
+
+    synthetic = SyntheticData.from_spec(args.synthetic) if args.synthetic else None
+    server = start_mock_upstream(args.port, args.delay, delays, synthetic, args.jitter, args.error_rate,
+                                 args.rate_limit_rate, args.api_error_rate, args.hang_rate,
+                                 args.hang_seconds, args.seed)
+    print(f"🧪 Mock api-sports upstream on http://localhost:{server.server_port}")
+    if synthetic is not None:
+        print(f"   Synthetic: {len(synthetic.league_ids)} leagues × {synthetic.teams_per_league} teams "
+              f"(league IDs {synthetic.league_ids[0]}..{synthetic.league_ids[-1]})")
+    print(f"   Point the API at it with FOOTBALL_API_BASE_URL=http://localhost:{server.server_port}\n")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,242 @@
+"""
+Precomputed prediction store
+SQLite table of fixtures + predictions indexed by fixture, league and date,
+kept warm by a background refresh scheduler
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from itertools import groupby
+from typing import Dict, List
+
+from fixtures import Fixture, FixtureBatch
+from teams import TEAMS
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    league_id   INTEGER NOT NULL,
+    fixture_id  INTEGER NOT NULL,
+    position    INTEGER NOT NULL,
+    match_date  TEXT NOT NULL,
+    home_team   TEXT NOT NULL,
+    away_team   TEXT NOT NULL,
+    fixture     TEXT NOT NULL,
+    prediction  TEXT NOT NULL,
+    PRIMARY KEY (league_id, fixture_id)
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_fixture ON predictions (fixture_id);
+CREATE INDEX IF NOT EXISTS idx_predictions_date ON predictions (league_id, match_date);
+CREATE INDEX IF NOT EXISTS idx_predictions_matchup ON predictions (home_team, away_team, match_date);
+CREATE TABLE IF NOT EXISTS refreshes (
+    league_id    INTEGER PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+);
+"""
+
+
+class PredictionStore:
+    """SQLite-backed predictions; one shared connection guarded by a lock"""
+
+    def __init__(self, path: str = 'predictions.db'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            if self.path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def reopen(self):
+        """New connection for a forked worker; SQLite handles must not cross fork()"""
+        self._lock = threading.Lock()
+        self._connect()
+
+    def replace_league(self, league_id: int, matches: FixtureBatch, preds: List[Dict]):
+        """Atomically swap a league's stored slate for a freshly computed one"""
+        rows = [
+            (
+                league_id,
+                match.id,
+                position,
+                match.date,
+                match.home,
+                match.away,
+                json.dumps(match.to_record()),
+                json.dumps(pred),
+            )
+            for position, (match, pred) in enumerate(zip(matches, preds))
+        ]
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM predictions WHERE league_id = ?', (league_id,))
+            self._conn.executemany('INSERT INTO predictions VALUES (?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            self._conn.execute('INSERT OR REPLACE INTO refreshes VALUES (?, ?)', (league_id, time.time()))
+
+    def league(self, league_id: int) -> List[tuple]:
+        """(Fixture, prediction) pairs for a league in upstream order"""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT fixture, prediction FROM predictions WHERE league_id = ? ORDER BY position',
+                (league_id,),
+            ).fetchall()
+        return [(Fixture.from_record(json.loads(fixture)), json.loads(pred)) for fixture, pred in rows]
+
+    def fixtures_with_teams(self, team_names: List[str]) -> List[tuple]:
+        """(league_id, Fixture) for every stored fixture involving any of the teams"""
+        if not team_names:
+            return []
+        marks = ', '.join('?' * len(team_names))
+        with self._lock:
+            rows = self._conn.execute(
+                f'SELECT league_id, fixture FROM predictions '
+                f'WHERE home_team IN ({marks}) OR away_team IN ({marks}) ORDER BY league_id, position',
+                list(team_names) * 2,
+            ).fetchall()
+        return [(league_id, Fixture.from_record(json.loads(fixture))) for league_id, fixture in rows]
+
+    def update_predictions(self, league_id: int, matches: List[Fixture], preds: List[Dict]):
+        """Overwrite the stored predictions of some fixtures, leaving the rest of the slate"""
+        rows = [(json.dumps(pred), league_id, match.id) for match, pred in zip(matches, preds)]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'UPDATE predictions SET prediction = ? WHERE league_id = ? AND fixture_id = ?', rows
+            )
+
+    def fixture(self, fixture_id: int) -> Dict:
+        """Stored prediction for one fixture, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT prediction FROM predictions WHERE fixture_id = ? LIMIT 1', (fixture_id,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def matchup(self, home_team: str, away_team: str) -> Dict:
+        """Stored prediction for the next fixture between two teams, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT prediction FROM predictions WHERE home_team = ? AND away_team = ? '
+                'ORDER BY match_date LIMIT 1',
+                (home_team, away_team),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def refreshed_at(self, league_id: int) -> float:
+        """Unix time of the league's last refresh, or None if never stored"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT refreshed_at FROM refreshes WHERE league_id = ?', (league_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, league_id: int, max_age: float) -> bool:
+        """Refreshed within max_age seconds; a max_age of 0 or less never expires"""
+        refreshed_at = self.refreshed_at(league_id)
+        return refreshed_at is not None and (max_age <= 0 or time.time() - refreshed_at < max_age)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM predictions').fetchone()[0]
+            refreshes = dict(self._conn.execute('SELECT league_id, refreshed_at FROM refreshes').fetchall())
+        return {
+            'path': self.path,
+            'predictions': count,
+            'leagues': {league_id: round(time.time() - at, 1) for league_id, at in refreshes.items()},
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class RefreshScheduler:
+    """
+    Background thread that recomputes every configured league on an interval.
+    Call refresh() for a synchronous forced refresh, or trigger() to wake the
+    thread early.
+    """
+
+    def __init__(self, predictor, store: PredictionStore, league_ids: List[int], interval: float = 900):
+        self.predictor = predictor
+        self.store = store
+        self.league_ids = list(league_ids)
+        self.interval = interval
+        self.last_run = None
+        self.runs = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, league_ids: List[int] = None) -> Dict[int, int]:
+        """Fetch, predict and store the given leagues now; returns fixtures per league"""
+        league_ids = list(league_ids or self.league_ids)
+        with self._refresh_lock:
+            by_league = self.predictor.get_upcoming_matches_many(league_ids)
+            # Every league is predicted in one pass, then stored per league
+            slate = FixtureBatch.concat([by_league[league_id] for league_id in league_ids])
+            preds = self.predictor.predict_matches(slate)
+            counts = {}
+            start = 0
+            for league_id in league_ids:
+                matches = by_league[league_id]
+                self.store.replace_league(league_id, matches, preds[start:start + len(matches)])
+                start += len(matches)
+                counts[league_id] = len(matches)
+            self.last_run = time.time()
+            self.runs += 1
+        return counts
+
+    def refresh_teams(self, team_indices) -> int:
+        """
+        Re-predict only the stored fixtures involving the given teams (e.g.
+        after their injuries changed); returns how many were updated
+        """
+        rows = self.store.fixtures_with_teams(TEAMS.names_for(team_indices))
+        with self._refresh_lock:
+            for league_id, group in groupby(rows, key=lambda row: row[0]):
+                matches = [match for _, match in group]
+                self.store.update_predictions(league_id, matches, self.predictor.predict_matches(matches))
+        return len(rows)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='prediction-refresh', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def trigger(self):
+        self._wake.set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.exception("Prediction refresh failed: %s", e)
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def stats(self) -> Dict:
+        return {
+            'running': self.running,
+            'interval': self.interval,
+            'leagues': self.league_ids,
+            'runs': self.runs,
+            'last_run': self.last_run,
+        }
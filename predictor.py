@@ -1,71 +1,207 @@
 """
 Football Match Predictor - Enhanced with Injury Factors
-Uses rule-based system + injury consideration
+Poisson/Dixon-Coles goals model + injury consideration
 """
 
-import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from functools import partial
 from typing import Dict, List, Tuple
-import json
+import hashlib
+import logging
+import os
 import random
 
+import numpy as np
+
+import goals_model
+import metrics
+from api_client import ApiSportsClient
+from cache import FixtureCache, PredictionMemo
+from engines import EngineRegistry, Matchups, PredictionEngine
+from fixtures import FixtureBatch
+from injuries import SAMPLE_INJURIES, InjuryIndex, InjuryState
+from ratings import Ratings
+from teams import TEAMS
+
+logger = logging.getLogger(__name__)
+
+
+# Bump whenever the prediction rules change; part of every deterministic seed
+MODEL_VERSION = '2.0'
+
+# Leagues served by the API (api-sports league IDs)
+LEAGUES = [
+    {'id': 39, 'name': 'Premier League', 'country': 'England', 'flag': '🏴󠁧󠁢󠁥󠁮󠁧󠁿'},
+    {'id': 140, 'name': 'La Liga', 'country': 'Spain', 'flag': '🇪🇸'},
+    {'id': 135, 'name': 'Serie A', 'country': 'Italy', 'flag': '🇮🇹'},
+    {'id': 78, 'name': 'Bundesliga', 'country': 'Germany', 'flag': '🇩🇪'},
+    {'id': 61, 'name': 'Ligue 1', 'country': 'France', 'flag': '🇫🇷'},
+    {'id': 2, 'name': 'Champions League', 'country': 'Europe', 'flag': '⚽'},
+]
+
+# Uniform draws consumed per prediction: home form, away form
+DRAWS_PER_MATCH = 2
+
+# Rating points a side loses per key player missing
+# (scaled by each player's impact weight)
+INJURY_PENALTY = 3
+
+# Log expected-goals shift per point of recent-form difference
+FORM_SCALE = 0.03
+
+OUTCOMES = np.array(["Home Win", "Draw", "Away Win"])
+
+PREDICTIONS = metrics.counter('football_predictions_total', 'Matches predicted')
+FIXTURE_FALLBACKS = metrics.counter(
+    'football_fixture_fallbacks_total',
+    'Failed upstream fixture fetches, by what was served instead (last_good or mock)', ('league', 'source')
+)
+
 
 class FootballPredictor:
     """Enhanced football match prediction engine with injury factors"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, deterministic: bool = False, ratings: Ratings = None):
         self.api_key = api_key
-        self.base_url = "https://v3.football.api-sports.io"
-        self.headers = {
-            'x-rapidapi-host': "v3.football.api-sports.io",
-            'x-rapidapi-key': api_key or "YOUR_API_KEY_HERE"
-        }
+        # Seed every prediction from (fixture, model version, data version)
+        self.deterministic = deterministic
+        self.client = ApiSportsClient.from_env(api_key)
         
-        # Simulated injury data (in real app, fetch from API)
-        self.injuries = {
-            'Manchester United': ['Casemiro', 'Lisandro Martinez'],  # 2 key players out
-            'Liverpool': [],  # No major injuries
-            'Manchester City': ['Kevin De Bruyne'],  # 1 key player out
-            'Arsenal': [],
-            'Real Madrid': [],
-            'Barcelona': ['Pedri'],
-            'Inter Milan': [],
-            'Juventus': ['Paul Pogba'],
-            'Bayern Munich': [],
-            'Borussia Dortmund': ['Marco Reus'],
-        }
+        # Absent players per team; sample data until an InjuryFeed polls
+        self.injury_index = InjuryIndex.from_dict(SAMPLE_INJURIES, source='sample')
         
-    def get_upcoming_matches(self, league_id: int = 39, next_days: int = 7) -> List[Dict]:
+        # Team ratings snapshot (static table until results are applied)
+        self.set_ratings(ratings or Ratings.initial())
+        
+        # Scoring engines: the rule-based model serves until another is activated
+        self.engines = EngineRegistry(
+            PoissonEngine(),
+            sample_rate=float(os.getenv('SHADOW_SAMPLE_RATE', 1.0)),
+            max_pending=int(os.getenv('SHADOW_MAX_PENDING', 8)),
+        )
+        
+        # Single-match predictions keyed by matchup + both teams' injury versions
+        self.predict_memo = PredictionMemo(max_entries=int(os.getenv('PREDICT_MEMO_SIZE', 1024)))
+        
+        # Caps how many upstream fetches one multi-league request runs at once
+        self._fanout_pool = ThreadPoolExecutor(
+            max_workers=int(os.getenv('FANOUT_MAX_WORKERS', 8)),
+            thread_name_prefix='fixture-fanout',
+        )
+        
+        # Upcoming fixtures keyed by (league, season, date window)
+        self.fixture_cache = FixtureCache(
+            ttl=float(os.getenv('FIXTURE_CACHE_TTL', 300)),
+            stale_ttl=float(os.getenv('FIXTURE_CACHE_STALE_TTL', 3600)),
+            max_entries=int(os.getenv('FIXTURE_CACHE_SIZE', 128)),
+        )
+        
+        # Latest successful fetch per (league, season), served while upstream fails
+        self.last_good_fixtures = {}
+        
+    def set_injuries(self, injuries: Dict[str, List[str]]):
+        """Replace all injury data with a {team: [players]} mapping"""
+        self.injury_index = InjuryIndex.from_dict(injuries)
+    
+    @property
+    def injuries(self) -> Dict[str, List[str]]:
+        return self.injury_index.to_dict()
+    
+    @property
+    def injury_version(self) -> str:
+        return self.injury_index.state.version
+    
+    def set_ratings(self, ratings: Ratings):
+        """Swap in a new rating snapshot; memoized predictions go stale via its version"""
+        self.ratings = ratings
+    
+    @property
+    def data_version(self) -> str:
+        """Snapshot of every input besides the fixture itself"""
+        return f"{self.ratings.version}-{self.injury_version}"
+    
+    @property
+    def model_version(self) -> str:
+        """Version of the engine serving predictions"""
+        return self.engines.active.version
+    
+    def match_rng(self, fixture_id: int = None, home_team: str = None, away_team: str = None,
+                  home_idx: int = None, away_idx: int = None, model_version: str = None) -> random.Random:
+        """
+        RNG seeded by (fixture id, model version, ratings version, both teams'
+        injury versions), so the same fixture predicts identically until the
+        model or data it depends on changes; injuries elsewhere leave it alone.
+        Without a fixture id the matchup names are used instead.
+        """
+        model_version = model_version or self.model_version
+        if home_idx is None:
+            home_idx = TEAMS.index(home_team)
+        if away_idx is None:
+            away_idx = TEAMS.index(away_team)
+        key = ('fixture', fixture_id) if fixture_id is not None else ('matchup', home_team, away_team)
+        team_versions = self.injury_index.state.team_versions
+        seed = (key, model_version, self.ratings.version, team_versions[home_idx], team_versions[away_idx])
+        digest = hashlib.sha256(repr(seed).encode()).digest()
+        return random.Random(int.from_bytes(digest[:8], 'big'))
+    
+    def get_upcoming_matches(self, league_id: int = 39, next_days: int = 7,
+                             season: int = 2025) -> FixtureBatch:
         """
-        Fetch upcoming matches
+        Fetch upcoming matches (served from the fixture cache when possible),
+        parsed once into a FixtureBatch.
+        If upstream fails, the league's last good fixtures are served, and
+        mock data only when there never were any.
         league_id: 39 = Premier League, 140 = La Liga, 135 = Serie A, 78 = Bundesliga
         """
-        endpoint = f"{self.base_url}/fixtures"
-        
+        return self.fetch_upcoming_matches(league_id, next_days, season)[0]
+    
+    def fetch_upcoming_matches(self, league_id: int = 39, next_days: int = 7,
+                               season: int = 2025) -> Tuple[FixtureBatch, str]:
+        """get_upcoming_matches plus where they came from: 'upstream', 'last_good' or 'mock'"""
         today = datetime.now()
         from_date = today.strftime("%Y-%m-%d")
         to_date = (today + timedelta(days=next_days)).strftime("%Y-%m-%d")
         
-        params = {
-            'league': league_id,
-            'season': 2025,
-            'from': from_date,
-            'to': to_date
-        }
+        key = (league_id, season, from_date, to_date)
         
         try:
-            response = requests.get(endpoint, headers=self.headers, params=params)
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('response', [])
-            else:
-                print(f"API Error: {response.status_code}")
-                return self._get_mock_matches()
+            return self.fixture_cache.get(
+                key, lambda: self._fetch_fixtures(league_id, season, from_date, to_date)
+            ), 'upstream'
         except Exception as e:
-            print(f"Error fetching matches: {e}")
-            return self._get_mock_matches()
+            last_good = self.last_good_fixtures.get((league_id, season))
+            if last_good is not None:
+                logger.warning("Error fetching matches for league %s, serving last good data: %s", league_id, e)
+                FIXTURE_FALLBACKS.inc(league=league_id, source='last_good')
+                # Drop what has kicked off since and what lies past this window;
+                # the last good fetch may have covered another one
+                return last_good.since(from_date).until(to_date), 'last_good'
+            logger.warning("Error fetching matches for league %s: %s", league_id, e)
+            FIXTURE_FALLBACKS.inc(league=league_id, source='mock')
+            return FixtureBatch.from_api(self._get_mock_matches()), 'mock'
     
-    def _get_mock_matches(self) -> List[Dict]:
+    def get_upcoming_matches_many(self, league_ids: List[int], next_days: int = 7,
+                                  season: int = 2025) -> Dict[int, FixtureBatch]:
+        """
+        Fetch several leagues concurrently on the shared fan-out pool.
+        Total latency is bounded by the slowest league, not the sum.
+        """
+        with metrics.stage('fetch'):
+            futures = {
+                league_id: self._fanout_pool.submit(self.get_upcoming_matches, league_id, next_days, season)
+                for league_id in league_ids
+            }
+            return {league_id: future.result() for league_id, future in futures.items()}
+    
+    def _fetch_fixtures(self, league_id: int, season: int, from_date: str, to_date: str) -> FixtureBatch:
+        """Fetch fixtures from api-sports, raising ApiSportsError on any upstream failure"""
+        fixtures = FixtureBatch.from_api(self.client.fixtures(league_id, season, from_date, to_date))
+        self.last_good_fixtures[(league_id, season)] = fixtures
+        return fixtures
+    
+    @staticmethod
+    def _get_mock_matches() -> List[Dict]:
         """Enhanced mock data with Champions League and World Cup matches"""
         base_time = datetime.now() + timedelta(days=1)
         
@@ -216,155 +352,234 @@ class FootballPredictor:
         ]
     
     def predict_match(self, home_team: str, away_team: str, 
-                     home_team_id: int = None, away_team_id: int = None) -> Dict:
+                     home_team_id: int = None, away_team_id: int = None,
+                     rng=None, fixture_id: int = None) -> Dict:
         """
-        Predict match outcome using enhanced AI with injury consideration
+        Predict match outcome from the Poisson goals model with injury consideration
+        rng: source of uniform draws (defaults to the global `random` module,
+        or to match_rng() in deterministic mode)
         """
+        return self.predict_pairs(
+            [home_team], [away_team], [home_team_id], [away_team_id],
+            rng=rng, fixture_ids=[fixture_id],
+        )[0]
+    
+    def predict_match_cached(self, home_team: str, away_team: str,
+                             home_team_id: int = None, away_team_id: int = None) -> Dict:
+        """
+        predict_match through the LRU memo. New ratings or another engine clear
+        it; an injury change only misses the matchups of the teams involved.
+        """
+        # current() picks up a swap made by another worker before the memo is consulted
+        active, _ = self.engines.current()
+        team_versions = self.injury_index.state.team_versions
+        return self.predict_memo.get(
+            (home_team, away_team, home_team_id, away_team_id,
+             team_versions[TEAMS.index(home_team, home_team_id)],
+             team_versions[TEAMS.index(away_team, away_team_id)]),
+            (self.ratings.version, active.name, active.version),
+            lambda: self.predict_match(home_team, away_team, home_team_id, away_team_id),
+        )
+    
+    def predict_matches(self, fixtures: FixtureBatch, rng=None) -> List[Dict]:
+        """
+        Predict a whole slate in one vectorized pass, straight from the batch's
+        columns (Fixture records or api-sports dicts are batched first).
+        Returns the same dicts as predict_match, in fixture order.
+        """
+        batch = FixtureBatch.of(fixtures)
+        with metrics.stage('predict'):
+            preds = self._predict_pairs(batch.home, batch.away, batch.home_idx, batch.away_idx,
+                                        rng, batch.fixture_ids)
+        PREDICTIONS.inc(len(preds))
+        return preds
+    
+    def predict_pairs(self, home_teams: List[str], away_teams: List[str],
+                      home_team_ids: List[int] = None, away_team_ids: List[int] = None,
+                      rng=None, fixture_ids: List[int] = None) -> List[Dict]:
+        """
+        Vectorized predict_match over parallel lists of team names.
+        Draws are taken from `rng` in the same order as calling predict_match
+        once per pair, so a seeded rng gives identical results on both paths.
+        In deterministic mode each pair draws from its own match_rng().
+        """
+        with metrics.stage('predict'):
+            preds = self._predict_pairs(
+                home_teams, away_teams,
+                TEAMS.indices(home_teams, home_team_ids), TEAMS.indices(away_teams, away_team_ids),
+                rng, fixture_ids,
+            )
+        PREDICTIONS.inc(len(preds))
+        return preds
+    
+    def _predict_pairs(self, home_teams: List[str], away_teams: List[str],
+                       home_idx: np.ndarray, away_idx: np.ndarray,
+                       rng, fixture_ids: List[int]) -> List[Dict]:
+        n = len(home_teams)
+        if n == 0:
+            return []
         
-        # Team strength ratings - Top leagues + International
-        team_strength = {
-            # Premier League
-            'Manchester City': 95, 'Arsenal': 90, 'Liverpool': 89,
-            'Aston Villa': 82, 'Tottenham': 81, 'Manchester United': 80,
-            'Chelsea': 79, 'Newcastle United': 78, 'Brighton': 75,
-            'West Ham': 74, 'Everton': 70, 'Fulham': 69,
-            
-            # La Liga
-            'Real Madrid': 96, 'Barcelona': 91, 'Atletico Madrid': 87,
-            'Real Sociedad': 79, 'Athletic Bilbao': 77, 'Real Betis': 76,
-            'Villarreal': 75, 'Valencia': 73, 'Sevilla': 72, 'Girona': 74,
-            
-            # Serie A
-            'Inter Milan': 92, 'AC Milan': 85, 'Juventus': 84,
-            'Napoli': 83, 'Roma': 80, 'Lazio': 79, 'Atalanta': 82,
-            'Fiorentina': 76, 'Bologna': 74,
-            
-            # Bundesliga
-            'Bayern Munich': 94, 'Bayer Leverkusen': 88, 'RB Leipzig': 84,
-            'Borussia Dortmund': 86, 'Union Berlin': 76, 'Eintracht Frankfurt': 75,
-            'VfB Stuttgart': 77, 'Wolfsburg': 73, 'Freiburg': 74,
-            
-            # Ligue 1
-            'Paris Saint-Germain': 93, 'Monaco': 80, 'Marseille': 79,
-            'Lyon': 77, 'Lille': 78, 'Nice': 76,
-            
-            # Other Champions League Teams
-            'Porto': 81, 'Benfica': 80, 'Sporting CP': 79,
-            'Ajax': 78, 'PSV': 80, 'Celtic': 74,
-            'Red Bull Salzburg': 76, 'Shakhtar Donetsk': 75,
-            
-            # World Cup 2026 - National Teams
-            'Brazil': 94, 'Argentina': 93, 'France': 92,
-            'England': 90, 'Spain': 89, 'Germany': 88,
-            'Portugal': 87, 'Belgium': 86, 'Netherlands': 87,
-            'Italy': 85, 'Uruguay': 82, 'Colombia': 81,
-            'Mexico': 78, 'USA': 80, 'Canada': 76,
-            'Japan': 77, 'South Korea': 77, 'Morocco': 79,
-            'Croatia': 83, 'Denmark': 80, 'Switzerland': 79,
-            'Poland': 78, 'Senegal': 78, 'Nigeria': 76,
-            'Egypt': 76, 'Ghana': 75, 'Cameroon': 75,
-            'Iran': 74, 'Saudi Arabia': 73, 'Australia': 75,
-            'Ecuador': 77, 'Peru': 75, 'Chile': 76,
-        }
+        engines = self.engines.current()
+        if rng is None and self.deterministic:
+            fixture_ids = fixture_ids or [None] * n
+            match_rng = partial(self.match_rng, model_version=engines[0].version)
+            draws = np.array([
+                [pair_rng.random() for _ in range(DRAWS_PER_MATCH)]
+                for pair_rng in map(match_rng, fixture_ids, home_teams, away_teams,
+                                    home_idx.tolist(), away_idx.tolist())
+            ]).reshape(n, DRAWS_PER_MATCH)
+        else:
+            rng = rng or random
+            draws = np.array([rng.random() for _ in range(n * DRAWS_PER_MATCH)]).reshape(n, DRAWS_PER_MATCH)
+        
+        matchups = Matchups(home_teams, away_teams, home_idx, away_idx, draws,
+                            self.ratings.values, self.injury_index.state, fixture_ids)
+        return self.engines.predict(matchups, engines)
+    
+    def score_matrices(self, home_teams: List[str], away_teams: List[str],
+                       home_team_ids: List[int] = None, away_team_ids: List[int] = None) -> np.ndarray:
+        """
+        (n, MAX_GOALS + 1, MAX_GOALS + 1) scoreline probabilities per pair at
+        average form, with no random draws; the input to season simulations
+        """
+        home_idx = TEAMS.indices(home_teams, home_team_ids)
+        away_idx = TEAMS.indices(away_teams, away_team_ids)
+        draws = np.full((len(home_idx), DRAWS_PER_MATCH), 0.5)
+        xg_home, xg_away = PoissonEngine.expected_goals(
+            home_idx, away_idx, draws, self.ratings.values, self.injury_index.state
+        )
+        return goals_model.score_matrix(xg_home, xg_away)
+
+
+class PoissonEngine(PredictionEngine):
+    """
+    The rule-based model: ratings less weighted absences plus simulated form
+    give expected goals, and a Dixon-Coles score matrix gives everything else
+    """
+    
+    name = 'poisson'
+    version = MODEL_VERSION
+    rho = goals_model.RHO
+    
+    def predict(self, matchups: Matchups) -> List[Dict]:
+        home_teams, away_teams, home_idx, away_idx, draws, ratings, injuries, _ = matchups
+        n = len(home_teams)
+        if n == 0:
+            return []
+        
+        home_strength = ratings[home_idx]
+        away_strength = ratings[away_idx]
+        home_injuries = injuries.counts[home_idx]
+        away_injuries = injuries.counts[away_idx]
+        
+        xg_home, xg_away = self.expected_goals(home_idx, away_idx, draws, ratings, injuries)
+        summary = goals_model.summarize(goals_model.score_matrix(xg_home, xg_away, rho=self.rho))
+        
+        # 1X2 straight from the matrix; the scoreline is the likeliest one
+        # consistent with the predicted outcome
+        probs = np.stack([summary['home_win'], summary['draw'], summary['away_win']], axis=1)
+        # Summation order differs with batch size; treat float-noise gaps as
+        # ties (home first) so a matchup gets the same pick on every path
+        pick = (probs >= probs.max(axis=1, keepdims=True) - 1e-9).argmax(axis=1)
+        confidence = probs[np.arange(n), pick]
+        choices = [summary['most_likely_home_win'], summary['most_likely_draw'], summary['most_likely_away_win']]
+        score_home = np.choose(pick, [c[0] for c in choices])
+        score_away = np.choose(pick, [c[1] for c in choices])
+        top_home, top_away = summary['most_likely']
         
-        home_strength = team_strength.get(home_team, 70)
-        away_strength = team_strength.get(away_team, 70)
+        # Convert to Python scalars once; per-element numpy indexing is slow
+        columns = zip(
+            home_teams, away_teams, home_idx.tolist(), away_idx.tolist(),
+            home_strength.tolist(), away_strength.tolist(),
+            home_injuries.tolist(), away_injuries.tolist(),
+            OUTCOMES[pick].tolist(), _round_list(confidence * 100),
+            score_home.tolist(), score_away.tolist(), top_home.tolist(), top_away.tolist(),
+            _round_list(probs[:, 0] * 100), _round_list(probs[:, 1] * 100), _round_list(probs[:, 2] * 100),
+            _round_list(summary['over_2_5'] * 100), _round_list(summary['btts'] * 100),
+            _round_list(xg_home, 2), _round_list(xg_away, 2),
+        )
+        return [
+            {
+                'prediction': pred,
+                'confidence': conf,
+                'reasons': self._reasons(home, away, h_idx, a_idx, hs, aws, hi, ai, injuries),
+                'score_prediction': f"{sh}-{sa}",
+                'most_likely_score': f"{th}-{ta}",
+                'home_win_prob': hp,
+                'draw_prob': dp,
+                'away_win_prob': ap,
+                'over_2_5_prob': over,
+                'btts_prob': btts,
+                'expected_goals': {'home': xh, 'away': xa}
+            }
+            for (home, away, h_idx, a_idx, hs, aws, hi, ai, pred, conf, sh, sa, th, ta,
+                 hp, dp, ap, over, btts, xh, xa) in columns
+        ]
+    
+    @staticmethod
+    def expected_goals(home_idx: np.ndarray, away_idx: np.ndarray, draws: np.ndarray,
+                       ratings: np.ndarray, injuries: InjuryState):
+        """Expected goals per pair from ratings, absences and the two form draws"""
+        home_strength = ratings[home_idx]
+        away_strength = ratings[away_idx]
+        
+        # 1. Team strength, weakened by weighted absences
+        home_rating = home_strength - injuries.impact[home_idx] * INJURY_PENALTY
+        away_rating = away_strength - injuries.impact[away_idx] * INJURY_PENALTY
+        
+        # 2. Recent form (simulated with randomness for variety)
+        home_form = np.where(home_strength > 80, 6 + (9 - 6) * draws[:, 0], 5 + (7 - 5) * draws[:, 0])
+        away_form = np.where(away_strength > 80, 6 + (9 - 6) * draws[:, 1], 5 + (7 - 5) * draws[:, 1])
         
-        score = 0
+        # 3. Expected goals (home advantage is in the base rates)
+        return goals_model.expected_goals(
+            home_rating, away_rating, home_boost=(home_form - away_form) * FORM_SCALE,
+        )
+    
+    def _reasons(self, home_team: str, away_team: str, home_idx: int, away_idx: int,
+                 home_strength: float, away_strength: float,
+                 home_injuries: int, away_injuries: int,
+                 injuries: InjuryState) -> List[str]:
+        """Top three human-readable factors behind a prediction"""
         reasons = []
         
-        # 1. Team strength difference
         strength_diff = home_strength - away_strength
-        score += strength_diff * 0.6
         if strength_diff > 10:
-            reasons.append(f"{home_team} significantly stronger (rating {home_strength} vs {away_strength})")
+            reasons.append(f"{home_team} significantly stronger (rating {home_strength:.0f} vs {away_strength:.0f})")
         elif strength_diff < -10:
-            reasons.append(f"{away_team} significantly stronger (rating {away_strength} vs {home_strength})")
-        
-        # 2. Home advantage
-        home_advantage = 10
-        score += home_advantage
-        reasons.append("Home advantage (+10 points)")
+            reasons.append(f"{away_team} significantly stronger (rating {away_strength:.0f} vs {home_strength:.0f})")
         
-        # 3. Injury impact (NEW FEATURE!)
-        home_injuries = len(self.injuries.get(home_team, []))
-        away_injuries = len(self.injuries.get(away_team, []))
-        injury_impact = (away_injuries - home_injuries) * 8
-        score += injury_impact
+        reasons.append("Home advantage")
         
         if home_injuries > 0:
-            reasons.append(f"{home_team} missing {home_injuries} key player(s): {', '.join(self.injuries[home_team][:2])}")
+            reasons.append(f"{home_team} missing {home_injuries} key player(s): {', '.join(injuries.players[home_idx][:2])}")
         if away_injuries > 0:
-            reasons.append(f"{away_team} missing {away_injuries} key player(s): {', '.join(self.injuries[away_team][:2])}")
-        
-        # 4. Recent form (simulated with randomness for variety)
-        home_form = random.uniform(6, 9) if home_strength > 80 else random.uniform(5, 7)
-        away_form = random.uniform(6, 9) if away_strength > 80 else random.uniform(5, 7)
-        form_diff = (home_form - away_form) * 4
-        score += form_diff
-        
-        # Convert score to prediction
-        if score > 12:
-            prediction = "Home Win"
-            confidence = min(65 + score * 1.2, 92)
-        elif score < -12:
-            prediction = "Away Win"
-            confidence = min(65 + abs(score) * 1.2, 92)
-        else:
-            prediction = "Draw"
-            confidence = min(45 + (10 - abs(score)) * 2, 65)
+            reasons.append(f"{away_team} missing {away_injuries} key player(s): {', '.join(injuries.players[away_idx][:2])}")
         
-        # Generate realistic score prediction
-        score_pred = self._predict_score(home_strength, away_strength, prediction, home_injuries, away_injuries)
-        
-        # Calculate probabilities
-        if prediction == "Home Win":
-            home_prob = confidence
-            away_prob = (100 - confidence) * 0.4
-            draw_prob = 100 - home_prob - away_prob
-        elif prediction == "Away Win":
-            away_prob = confidence
-            home_prob = (100 - confidence) * 0.4
-            draw_prob = 100 - home_prob - away_prob
-        else:
-            draw_prob = confidence
-            home_prob = (100 - confidence) * 0.5
-            away_prob = 100 - draw_prob - home_prob
-        
-        return {
-            'prediction': prediction,
-            'confidence': round(confidence, 1),
-            'reasons': reasons[:3],
-            'score_prediction': score_pred,
-            'home_win_prob': round(home_prob, 1),
-            'draw_prob': round(draw_prob, 1),
-            'away_win_prob': round(away_prob, 1)
-        }
+        return reasons[:3]
+
+
+class IndependentPoissonEngine(PoissonEngine):
+    """PoissonEngine without the Dixon-Coles low-score correction; a shadow-mode candidate"""
     
-    def _predict_score(self, home_str: int, away_str: int, prediction: str, 
-                      home_inj: int, away_inj: int) -> str:
-        """Generate realistic score prediction"""
-        diff = abs(home_str - away_str)
-        
-        if prediction == "Draw":
-            scores = ["1-1", "2-2", "0-0"]
-            return random.choice(scores[:2]) if diff < 10 else "1-1"
-        
-        elif prediction == "Home Win":
-            if diff > 20 or (diff > 10 and away_inj > 1):
-                return random.choice(["3-0", "4-1", "3-1"])
-            elif diff > 10:
-                return random.choice(["2-0", "3-1", "2-1"])
-            else:
-                return random.choice(["2-1", "1-0", "2-0"])
-        
-        else:  # Away Win
-            if diff > 20 or (diff > 10 and home_inj > 1):
-                return random.choice(["0-3", "1-4", "1-3"])
-            elif diff > 10:
-                return random.choice(["0-2", "1-3", "1-2"])
-            else:
-                return random.choice(["1-2", "0-1", "0-2"])
+    name = 'poisson_independent'
+    version = f"{MODEL_VERSION}-independent"
+    rho = 0.0
+
+
+def _round_list(values: np.ndarray, digits: int = 1) -> List[float]:
+    """
+    Vectorized round(x, digits) that matches Python's builtin exactly.
+    np.round scales first, which can land on the wrong side of a tie, so
+    values sitting within float noise of a rounding boundary are redone in Python.
+    """
+    scale = 10 ** digits
+    scaled = values * scale
+    rounded = (np.round(scaled) / scale).tolist()
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    for i in np.flatnonzero(near_tie).tolist():
+        rounded[i] = round(float(values[i]), digits)
+    return rounded
 
 
 def test_predictor():
@@ -379,11 +594,11 @@ def test_predictor():
     
     current_league = None
     for match in matches:
-        home_team = match['teams']['home']['name']
-        away_team = match['teams']['away']['name']
-        date = match['fixture']['date']
-        league_name = match['league']['name']
-        league_flag = match['league'].get('flag', '')
+        home_team = match.home
+        away_team = match.away
+        date = match.date
+        league_name = match.league
+        league_flag = match.flag
         
         if current_league != league_name:
             if current_league is not None:
@@ -0,0 +1,373 @@
+"""
+Elo-style team ratings for the Football Predictor
+Ratings start from the static TEAM_TABLE and move with every result:
+O(1) per match as results arrive, or a vectorized rebuild over a whole
+history. Every change is persisted so ratings can be recovered as of any date.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from teams import TEAMS, TeamRegistry
+
+
+# Rating points gained by beating an equal side with a one-goal margin, x2
+K_FACTOR = 2.0
+
+# Home edge in rating points when computing the expected result
+HOME_ADVANTAGE = 6.0
+
+# A gap of ELO_SCALE rating points makes the stronger side 10x the favourite
+ELO_SCALE = 40.0
+
+
+class Ratings:
+    """
+    Immutable rating snapshot: one value per registry index plus the
+    unknown-team slot. `version` hashes the values, so two snapshots with
+    the same ratings predict identically.
+    """
+
+    def __init__(self, values: np.ndarray, as_of: str = None, matches: int = 0,
+                 registry: TeamRegistry = TEAMS):
+        values = np.array(values, dtype=np.float64)
+        values.setflags(write=False)
+        self.values = values
+        self.as_of = as_of
+        self.matches = matches
+        self.registry = registry
+        digest = hashlib.sha256(registry.version.encode() + values.tobytes())
+        self.version = digest.hexdigest()[:12]
+
+    @classmethod
+    def initial(cls, registry: TeamRegistry = TEAMS) -> 'Ratings':
+        """The static TEAM_TABLE ratings, before any result"""
+        return cls(registry.ratings, registry=registry)
+
+    def rating(self, name: str = None, team_id: int = None) -> float:
+        return self.values.item(self.registry.index(name, team_id))
+
+    def to_dict(self) -> Dict:
+        return {
+            'version': self.version,
+            'as_of': self.as_of,
+            'matches': self.matches,
+            'ratings': {
+                name: round(value, 2)
+                for name, value in zip(self.registry.names, self.values.tolist())
+            },
+        }
+
+
+def goal_multiplier(goal_diff: np.ndarray) -> np.ndarray:
+    """World Football Elo margin weight: 1, 1.5, then (11 + diff) / 8"""
+    goal_diff = np.abs(goal_diff)
+    return np.where(goal_diff <= 1, 1.0, np.where(goal_diff == 2, 1.5, (11 + goal_diff) / 8))
+
+
+class RatingEngine:
+    """
+    Mutable Elo ratings over the team registry. The unknown-team slot is
+    shared by every unlisted team, so it is never updated.
+    """
+
+    def __init__(self, initial: Ratings = None, k_factor: float = K_FACTOR,
+                 home_advantage: float = HOME_ADVANTAGE, scale: float = ELO_SCALE):
+        initial = initial or Ratings.initial()
+        self.registry = initial.registry
+        self.k_factor = k_factor
+        self.home_advantage = home_advantage
+        self.scale = scale
+        self._initial = initial
+        self.values = initial.values.copy()
+        self.matches = initial.matches
+        self.as_of = initial.as_of
+        self._lock = threading.Lock()
+
+    def expected(self, home_rating, away_rating):
+        """Expected home score (win = 1, draw = 0.5) before the match"""
+        return 1.0 / (1.0 + 10.0 ** ((away_rating - home_rating - self.home_advantage) / self.scale))
+
+    def _delta(self, home_rating, away_rating, home_goals, away_goals):
+        goal_diff = np.asarray(home_goals) - np.asarray(away_goals)
+        actual = np.sign(goal_diff) * 0.5 + 0.5
+        return self.k_factor * goal_multiplier(goal_diff) * (actual - self.expected(home_rating, away_rating))
+
+    def update(self, home_team: str, away_team: str, home_goals: int, away_goals: int,
+               date: str = None, home_team_id: int = None, away_team_id: int = None) -> Tuple[float, float]:
+        """Apply one result in O(1); returns the new (home, away) ratings"""
+        home = self.registry.index(home_team, home_team_id)
+        away = self.registry.index(away_team, away_team_id)
+        with self._lock:
+            # One-element arrays take the same numpy kernels as apply(), so
+            # both paths produce bit-identical ratings (and versions)
+            delta = self._delta(self.values[[home]], self.values[[away]], home_goals, away_goals).item()
+            if home != self.registry.unknown:
+                self.values[home] += delta
+            if away != self.registry.unknown:
+                self.values[away] -= delta
+            self.matches += 1
+            if date is not None and (self.as_of is None or date > self.as_of):
+                self.as_of = date
+            return self.values.item(home), self.values.item(away)
+
+    def apply(self, matches: Sequence[Dict]) -> List[Tuple[str, str, float]]:
+        """
+        Apply many results (dicts shaped like backtest.load_matches rows) in
+        date order, vectorized. Matches are grouped into waves in which no
+        team plays twice; each wave is one numpy update, and the result is
+        identical to calling update() once per match.
+        Returns (date, team, new rating) history rows in match order.
+        """
+        matches = sorted(matches, key=lambda m: m['date'])
+        n = len(matches)
+        if n == 0:
+            return []
+        registry = self.registry
+        unknown = registry.unknown
+        home = registry.indices([m['home_team'] for m in matches], [m.get('home_team_id') for m in matches])
+        away = registry.indices([m['away_team'] for m in matches], [m.get('away_team_id') for m in matches])
+        home_goals = np.array([m['home_goals'] for m in matches], dtype=np.int64)
+        away_goals = np.array([m['away_goals'] for m in matches], dtype=np.int64)
+
+        # A match goes in the wave after the latest one either team played in
+        waves = np.empty(n, dtype=np.int64)
+        last_wave = {}
+        for i, (h, a) in enumerate(zip(home.tolist(), away.tolist())):
+            wave = max(last_wave.get(h, -1), last_wave.get(a, -1)) + 1
+            waves[i] = wave
+            if h != unknown:
+                last_wave[h] = wave
+            if a != unknown:
+                last_wave[a] = wave
+
+        new_home = np.empty(n)
+        new_away = np.empty(n)
+        order = np.argsort(waves, kind='stable')
+        bounds = np.flatnonzero(np.diff(waves[order])) + 1
+        with self._lock:
+            values = self.values
+            for wave in np.split(order, bounds):
+                h, a = home[wave], away[wave]
+                delta = self._delta(values[h], values[a], home_goals[wave], away_goals[wave])
+                new_home[wave] = values[h] + delta
+                new_away[wave] = values[a] - delta
+                known_home = h != unknown
+                known_away = a != unknown
+                values[h[known_home]] = new_home[wave][known_home]
+                values[a[known_away]] = new_away[wave][known_away]
+            self.matches += n
+            if self.as_of is None or matches[-1]['date'] > self.as_of:
+                self.as_of = matches[-1]['date']
+
+        history = []
+        names = registry.names
+        for match, h, a, rh, ra in zip(matches, home.tolist(), away.tolist(),
+                                       new_home.tolist(), new_away.tolist()):
+            if h != unknown:
+                history.append((match['date'], names[h], rh))
+            if a != unknown:
+                history.append((match['date'], names[a], ra))
+        return history
+
+    def rebuild(self, matches: Sequence[Dict]) -> List[Tuple[str, str, float]]:
+        """Reset to the initial ratings and replay a full history"""
+        with self._lock:
+            self.values = self._initial.values.copy()
+            self.matches = self._initial.matches
+            self.as_of = self._initial.as_of
+        return self.apply(matches)
+
+    def snapshot(self) -> Ratings:
+        with self._lock:
+            return Ratings(self.values, as_of=self.as_of, matches=self.matches, registry=self.registry)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rating_history (
+    seq         INTEGER PRIMARY KEY AUTOINCREMENT,
+    match_date  TEXT NOT NULL,
+    team        TEXT NOT NULL,
+    rating      REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rating_history_team ON rating_history (team, match_date);
+"""
+
+
+class RatingStore:
+    """
+    Append-only SQLite log of rating changes. The ratings as of any date are
+    each team's latest entry on or before it, so snapshots never need to be
+    copied and old predictions can be reproduced exactly.
+    """
+
+    def __init__(self, path: str = 'ratings.db', registry: TeamRegistry = TEAMS):
+        self.path = path
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._connect()
+
+    def _connect(self):
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock:
+            if self.path != ':memory:':
+                self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.executescript(SCHEMA)
+
+    def reopen(self):
+        """New connection for a forked worker; SQLite handles must not cross fork()"""
+        self._lock = threading.Lock()
+        self._connect()
+
+    def append(self, history: Iterable[Tuple[str, str, float]]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO rating_history (match_date, team, rating) VALUES (?, ?, ?)', history
+            )
+
+    def replace(self, history: Iterable[Tuple[str, str, float]]):
+        """Swap the whole log, e.g. after RatingEngine.rebuild()"""
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM rating_history')
+            self._conn.executemany(
+                'INSERT INTO rating_history (match_date, team, rating) VALUES (?, ?, ?)', history
+            )
+
+    def apply(self, matches: Sequence[Dict]) -> Tuple[Ratings, int]:
+        """
+        Apply results on top of the latest stored ratings and log the changes
+        in one write transaction, so concurrent writers (other workers) queue
+        up instead of building on the same baseline. Returns the new ratings
+        and last_seq().
+        """
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                engine = RatingEngine(initial=self._as_of())
+                self._conn.executemany(
+                    'INSERT INTO rating_history (match_date, team, rating) VALUES (?, ?, ?)', engine.apply(matches)
+                )
+                seq = self._conn.execute('SELECT COALESCE(MAX(seq), 0) FROM rating_history').fetchone()[0]
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return engine.snapshot(), seq
+
+    def as_of(self, date: str = None) -> Ratings:
+        """Ratings after every stored result on or before `date` (default: all)"""
+        with self._lock:
+            return self._as_of(date)
+
+    def _as_of(self, date: str = None) -> Ratings:
+        """as_of() with the lock held"""
+        query = 'SELECT team, rating, MAX(seq) FROM rating_history'
+        params = ()
+        if date is not None:
+            query += ' WHERE match_date <= ?'
+            params = (date,)
+        rows = self._conn.execute(query + ' GROUP BY team', params).fetchall()
+
+        values = self.registry.ratings.astype(np.float64)
+        latest = None
+        for team, rating, _ in rows:
+            idx = self.registry.by_name.get(team)
+            if idx is not None:
+                values[idx] = rating
+        if rows:
+            latest = self._conn.execute(
+                'SELECT match_date FROM rating_history WHERE seq = ?', (max(row[2] for row in rows),)
+            ).fetchone()[0]
+        return Ratings(values, as_of=latest, registry=self.registry)
+
+    def last_seq(self) -> int:
+        """Sequence number of the newest entry (0 when empty); changes on every write"""
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(MAX(seq), 0) FROM rating_history').fetchone()[0]
+
+    def engine(self, **kwargs) -> RatingEngine:
+        """An engine continuing from the latest stored ratings"""
+        return RatingEngine(initial=self.as_of(), **kwargs)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            count, latest = self._conn.execute(
+                'SELECT COUNT(*), MAX(match_date) FROM rating_history'
+            ).fetchone()
+        return {'path': self.path, 'entries': count, 'latest': latest}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SharedRatings:
+    """
+    The latest ratings of a RatingStore that several processes write to.
+    apply() stores results through the store's write transaction; sync()
+    reloads, at most every `interval` seconds, once another process has
+    stored more.
+    """
+
+    def __init__(self, store: RatingStore, initial: Ratings = None, interval: float = 1.0):
+        self.store = store
+        self.interval = interval
+        self.seq = store.last_seq()
+        self.ratings = initial or store.as_of()
+        self._next_sync = time.monotonic() + interval
+        self._lock = threading.Lock()
+
+    def apply(self, matches: Sequence[Dict]) -> Ratings:
+        ratings, seq = self.store.apply(matches)
+        with self._lock:
+            if seq > self.seq:
+                self.ratings, self.seq = ratings, seq
+            return self.ratings
+
+    def sync(self, force: bool = False) -> bool:
+        """Reload if another process stored results; True when the ratings changed"""
+        now = time.monotonic()
+        if not force and now < self._next_sync:
+            return False
+        self._next_sync = now + self.interval
+        seq = self.store.last_seq()
+        if seq <= self.seq:
+            return False
+        ratings = self.store.as_of()
+        with self._lock:
+            if seq <= self.seq:
+                return False
+            self.ratings, self.seq = ratings, seq
+        return True
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from backtest import load_matches
+
+    parser = argparse.ArgumentParser(description='Rebuild team ratings from a results history')
+    parser.add_argument('path', help='CSV or Parquet file of past results (same columns as backtest.py)')
+    parser.add_argument('-s', '--store', default='ratings.db', help='rating store to overwrite')
+    args = parser.parse_args()
+
+    matches = load_matches(args.path)
+    started = time.perf_counter()
+    engine = RatingEngine()
+    history = engine.rebuild(matches)
+    elapsed = time.perf_counter() - started
+
+    store = RatingStore(args.store)
+    store.replace(history)
+    snapshot = engine.snapshot()
+
+    print(f"⚡ Replayed {len(matches)} results in {elapsed:.2f}s (as of {snapshot.as_of})")
+    print(f"💾 Saved {len(history)} rating changes to {args.store} (version {snapshot.version})\n")
+    top = sorted(snapshot.to_dict()['ratings'].items(), key=lambda item: -item[1])[:10]
+    for rank, (team, rating) in enumerate(top, 1):
+        print(f"{rank:>3}. {team:<24}{rating:>7}")
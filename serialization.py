@@ -0,0 +1,219 @@
+"""
+Streaming JSON helpers for the Football Predictor API
+Incremental parsing of NDJSON / JSON-array request bodies with bounded memory,
+fast encoding (orjson when installed) and response field selection
+"""
+
+import codecs
+import json
+from typing import Any, BinaryIO, Dict, Iterable, Iterator
+
+try:
+    import orjson
+except ImportError:  # optional speedup
+    orjson = None
+
+CHUNK_SIZE = 64 * 1024
+
+# Largest single JSON array element accepted, in characters
+MAX_ELEMENT_SIZE = 1024 * 1024
+
+# A decode error this close to the end of the buffer may just be a value cut
+# off by the chunk edge (`tru` of `true`, `1.5e` of `1.5e3`)
+_TRUNCATION_MARGIN = 6
+
+_WHITESPACE = ' \t\n\r'
+
+
+def iter_ndjson(stream: BinaryIO, skip_invalid: bool = False, chunk_size: int = CHUNK_SIZE,
+                max_line: int = MAX_ELEMENT_SIZE) -> Iterator[Any]:
+    """
+    Yield one decoded value per non-blank line. With skip_invalid, a line that
+    fails to parse or runs over `max_line` bytes yields its ValueError in place
+    instead of ending the stream; the rest of an overlong line is skipped.
+    """
+    pending = bytearray()
+    skipping = False  # inside a line already reported as too long
+    while True:
+        # Read in chunks; line iteration on WSGI input streams is byte-at-a-time
+        chunk = stream.read(chunk_size)
+        if chunk:
+            lines = chunk.split(b'\n')
+            tail = lines.pop()
+        else:
+            lines, tail = [b''], b''  # flush the last line
+        if lines:
+            lines[0] = b'' if skipping else bytes(pending) + lines[0]
+            skipping = False
+            pending = bytearray(tail)
+        elif not skipping:
+            pending += tail
+        for line in lines:
+            if len(line) > max_line:
+                error = ValueError(f"Line longer than {max_line} bytes")
+                if not skip_invalid:
+                    raise error
+                yield error
+                continue
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                if not skip_invalid:
+                    raise
+                yield e
+        if len(pending) > max_line:
+            pending = bytearray()
+            skipping = True
+            error = ValueError(f"Line longer than {max_line} bytes")
+            if not skip_invalid:
+                raise error
+            yield error
+        if not chunk:
+            return
+
+
+def iter_json_array(stream: BinaryIO, chunk_size: int = CHUNK_SIZE,
+                    max_element: int = MAX_ELEMENT_SIZE) -> Iterator[Any]:
+    """
+    Yield the elements of a top-level JSON array as they are read.
+    Only the element being decoded plus one chunk is held in memory.
+    Raises ValueError on malformed input or an element over `max_element`.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8')()
+    buf = ''
+    pos = 0
+    eof = False
+    expect = '['  # '[' -> 'value_or_end' -> 'separator' -> 'value' -> ...
+
+    while True:
+        while pos < len(buf) and buf[pos] in _WHITESPACE:
+            pos += 1
+
+        if pos == len(buf) or (expect in ('value', 'value_or_end') and not eof and _needs_more(buf, pos)):
+            if eof:
+                if pos == len(buf):
+                    raise ValueError("Unexpected end of JSON array")
+            else:
+                _check_element_size(buf, pos, max_element)
+                chunk = stream.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + text.decode(chunk, final=eof)
+                pos = 0
+                continue
+
+        char = buf[pos]
+        if expect == '[':
+            if char != '[':
+                raise ValueError("Expected a JSON array")
+            pos += 1
+            expect = 'value_or_end'
+        elif expect == 'separator' or (expect == 'value_or_end' and char == ']'):
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Expected ',' or ']' but found {char!r}")
+            pos += 1
+            expect = 'value'
+        else:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as e:
+                if eof or not _maybe_truncated(e, buf):
+                    raise ValueError(f"Malformed JSON array element: {e}")
+                # Element continues in the next chunk
+                _check_element_size(buf, pos, max_element)
+                chunk = stream.read(chunk_size)
+                eof = not chunk
+                buf = buf[pos:] + text.decode(chunk, final=eof)
+                pos = 0
+                continue
+            yield value
+            pos = end
+            expect = 'separator'
+
+
+def _maybe_truncated(error: json.JSONDecodeError, buf: str) -> bool:
+    """
+    Whether a decode error could be the chunk edge rather than bad input: it
+    sits at the very end of the buffer, or a string runs on to the end
+    """
+    return error.pos >= len(buf) - _TRUNCATION_MARGIN or error.msg.startswith('Unterminated string')
+
+
+def _check_element_size(buf: str, pos: int, max_element: int):
+    if len(buf) - pos > max_element:
+        raise ValueError(f"JSON array element larger than {max_element} characters")
+
+
+def _needs_more(buf: str, pos: int) -> bool:
+    """
+    True when a value starting at `pos` might be cut off by the chunk edge:
+    raw_decode would happily accept a truncated number such as `12` of `123`.
+    """
+    return buf[pos] not in '{["' and not any(c in buf[pos:] for c in ',]')
+
+
+def dumps(obj: Any) -> bytes:
+    """Compact JSON with sorted keys, via orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def parse_fields(spec: str) -> Dict:
+    """
+    Parse a field selection like "match_id,home_team.name,probabilities"
+    into a tree: {'match_id': None, 'home_team': {'name': None}, 'probabilities': None}
+    None means "the whole value". Returns None when nothing is selected.
+    """
+    tree = {}
+    for path in (part.strip() for part in (spec or '').split(',')):
+        if not path:
+            continue
+        node = tree
+        keys = path.split('.')
+        for key in keys[:-1]:
+            child = node.get(key, {})
+            if child is None:  # parent already selected whole
+                break
+            node = node.setdefault(key, child)
+        else:
+            node[keys[-1]] = None
+    return tree or None
+
+
+def select_fields(obj: Dict, tree: Dict) -> Dict:
+    """Project a dict onto a parse_fields() tree; unknown keys are skipped"""
+    if tree is None:
+        return obj
+    selected = {}
+    for key, subtree in tree.items():
+        if key not in obj:
+            continue
+        value = obj[key]
+        selected[key] = select_fields(value, subtree) if subtree and isinstance(value, dict) else value
+    return selected
+
+
+def iter_ndjson_lines(items: Iterable[Dict]) -> Iterator[bytes]:
+    """Encode each item as one NDJSON line"""
+    for item in items:
+        yield dumps(item) + b'\n'
+
+
+def iter_json_document(items: Iterable[Dict], key: str, envelope: Dict) -> Iterator[bytes]:
+    """
+    Stream `{...envelope, key: [items...], "count": n}` piece by piece.
+    The array is written as items arrive; the count follows it.
+    """
+    head = dumps(envelope)[:-1]  # drop closing brace
+    yield head + (b',' if len(head) > 1 else b'') + dumps(key) + b':['
+    count = 0
+    for item in items:
+        yield (b',' if count else b'') + dumps(item)
+        count += 1
+    yield b'],"count":' + str(count).encode() + b'}'
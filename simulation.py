@@ -0,0 +1,285 @@
+"""
+Monte Carlo season simulation for the Football Predictor
+Plays out every remaining fixture of a league many times from the
+predictor's scoreline probabilities, starting from the current table, and
+reports how often each team finishes in each position (title, top 4,
+relegation, qualification). Simulations are vectorized with NumPy and split
+into chunks run on a long-lived process pool; each chunk draws from its own child of
+one SeedSequence, so results depend on the seed and not on the worker count.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from fixtures import Fixture, FixtureBatch
+from goals_model import MAX_GOALS
+
+logger = logging.getLogger(__name__)
+
+
+# Simulations per chunk; also the unit of work sent to a pool process
+CHUNK_SIZE = 10000
+
+# How far ahead to look for remaining fixtures
+HORIZON_DAYS = 300
+
+# Finishing-position zones as (start, stop) slices of the final table
+DEFAULT_ZONES = {'title': (0, 1), 'top_4': (0, 4), 'relegation': (-3, None)}
+LEAGUE_ZONES = {
+    78: {'title': (0, 1), 'top_4': (0, 4), 'relegation': (-2, None)},
+    61: {'title': (0, 1), 'top_4': (0, 4), 'relegation': (-2, None)},
+    2: {'top_8': (0, 8), 'knockout_playoff': (8, 24), 'eliminated': (24, None)},
+    1: {'qualification': (0, 2)},
+}
+
+# Long-lived process pools by size, owned by the process that created them
+_pools = {}
+_pools_lock = threading.Lock()
+
+_CELLS = (MAX_GOALS + 1) ** 2
+# Per flattened scoreline cell: goals, goal difference and points per side
+_HOME_GOALS = (np.arange(_CELLS) // (MAX_GOALS + 1)).astype(np.int32)
+_AWAY_GOALS = (np.arange(_CELLS) % (MAX_GOALS + 1)).astype(np.int32)
+_GOAL_DIFF = _HOME_GOALS - _AWAY_GOALS
+_HOME_POINTS = np.select([_GOAL_DIFF > 0, _GOAL_DIFF == 0], [3, 1], 0).astype(np.int32)
+_AWAY_POINTS = np.select([_GOAL_DIFF < 0, _GOAL_DIFF == 0], [3, 1], 0).astype(np.int32)
+
+
+def simulate_chunk(points: np.ndarray, goal_diff: np.ndarray, goals_for: np.ndarray,
+                   home: np.ndarray, away: np.ndarray, cdf: np.ndarray,
+                   n_sims: int, seed: np.random.SeedSequence) -> Dict[str, np.ndarray]:
+    """
+    One batch of n_sims seasons. `home`/`away` are table positions per
+    fixture and `cdf` the cumulative scoreline probabilities per fixture.
+    Returns finishing-position counts (team x position) and summed points.
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    # Team-major, so each fixture updates two contiguous rows
+    total_points = np.repeat(points[:, None].astype(np.int32), n_sims, axis=1)
+    total_diff = np.repeat(goal_diff[:, None].astype(np.int32), n_sims, axis=1)
+    total_for = np.repeat(goals_for[:, None].astype(np.int32), n_sims, axis=1)
+
+    for j in range(len(home)):
+        cell = np.minimum(np.searchsorted(cdf[j], rng.random(n_sims), side='right'), _CELLS - 1)
+        h, a = home[j], away[j]
+        total_points[h] += _HOME_POINTS[cell]
+        total_points[a] += _AWAY_POINTS[cell]
+        diff = _GOAL_DIFF[cell]
+        total_diff[h] += diff
+        total_diff[a] -= diff
+        total_for[h] += _HOME_GOALS[cell]
+        total_for[a] += _AWAY_GOALS[cell]
+
+    # Points, then goal difference, then goals scored; anything still level
+    # is settled at random
+    key = (total_points * 1_000_000.0 + (total_diff + 1000) * 1000.0 + total_for
+           + rng.random((n_teams, n_sims)))
+    order = np.argsort(-key, axis=0)
+    positions = np.empty_like(order)
+    np.put_along_axis(positions, order, np.arange(n_teams)[:, None], axis=0)
+    counts = np.bincount((np.arange(n_teams)[:, None] * n_teams + positions).ravel(),
+                         minlength=n_teams * n_teams).reshape(n_teams, n_teams)
+    return {'positions': counts, 'points': total_points.sum(axis=1)}
+
+
+def _run_chunk(args):
+    return simulate_chunk(*args)
+
+
+def _pool(workers: int) -> ProcessPoolExecutor:
+    """
+    A shared pool of `workers` processes, started once. Children are spawned,
+    not forked: the API calls this from threaded workers, and a fork there
+    copies locks other threads may be holding.
+    """
+    with _pools_lock:
+        pid, pool = _pools.get(workers, (None, None))
+        if pid != os.getpid():
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+            _pools[workers] = (os.getpid(), pool)
+        return pool
+
+
+def _discard_pool(workers: int, pool: ProcessPoolExecutor):
+    with _pools_lock:
+        if _pools.get(workers, (None, None))[1] is pool:
+            del _pools[workers]
+    pool.shutdown(wait=False)
+
+
+def simulate(points: np.ndarray, goal_diff: np.ndarray, goals_for: np.ndarray,
+             home: np.ndarray, away: np.ndarray, matrices: np.ndarray,
+             n_sims: int = 100000, seed: int = 0, workers: int = None) -> Dict[str, np.ndarray]:
+    """
+    Simulate n_sims seasons of one table. `matrices` holds each remaining
+    fixture's scoreline probabilities (see FootballPredictor.score_matrices).
+    Returns finishing-position probabilities (team x position) and expected
+    final points per team.
+    """
+    cdf = np.cumsum(matrices.reshape(len(matrices), _CELLS), axis=1)
+    sizes = [min(CHUNK_SIZE, n_sims - start) for start in range(0, n_sims, CHUNK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(points, goal_diff, goals_for, home, away, cdf, size, child) for size, child in zip(sizes, seeds)]
+
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        pool = _pool(workers)
+        try:
+            results = list(pool.map(_run_chunk, jobs))
+        except BrokenProcessPool:
+            # A child died (OOM killer, say); start a fresh pool next time
+            _discard_pool(workers, pool)
+            raise
+    else:
+        results = [_run_chunk(job) for job in jobs]
+
+    positions = sum(result['positions'] for result in results)
+    total_points = sum(result['points'] for result in results)
+    return {'positions': positions / n_sims, 'points': total_points / n_sims}
+
+
+def _parse_standings(response: List[Dict]) -> List[List[Dict]]:
+    """api-sports /standings -> one list of rows per group"""
+    groups = []
+    for entry in response:
+        for group in (entry.get('league') or {}).get('standings') or []:
+            groups.append([
+                {
+                    'name': row['team']['name'],
+                    'id': row['team'].get('id'),
+                    'points': row.get('points') or 0,
+                    'goal_diff': row.get('goalsDiff') or 0,
+                    'goals_for': ((row.get('all') or {}).get('goals') or {}).get('for') or 0,
+                }
+                for row in group
+            ])
+    return groups
+
+
+def _remaining_fixtures(predictor, league_id: int, season: int) -> Tuple[List[Fixture], str]:
+    """Fixtures not yet played, and their source (see FootballPredictor.fetch_upcoming_matches)"""
+    today = date.today()
+    try:
+        fixtures = predictor.client.fixtures(league_id, season, today.isoformat(),
+                                             (today + timedelta(days=HORIZON_DAYS)).isoformat())
+    except Exception as e:
+        logger.warning("Error fetching fixtures to simulate league %s: %s", league_id, e)
+        # The predictor's last good fixtures, or mock ones if it never had any
+        batch, source = predictor.fetch_upcoming_matches(league_id, HORIZON_DAYS, season)
+        return list(batch), source
+    return list(FixtureBatch.from_api([
+        match for match in fixtures
+        if (match['fixture'].get('status') or {}).get('short', 'NS') in ('NS', 'TBD', 'PST')
+    ])), 'upstream'
+
+
+def _standings(predictor, league_id: int, season: int) -> Tuple[List[List[Dict]], str]:
+    """Standings groups and their source: 'upstream', or 'unavailable' when the fetch failed"""
+    try:
+        return _parse_standings(predictor.client.standings(league_id, season)), 'upstream'
+    except Exception as e:
+        logger.warning("Error fetching standings to simulate league %s: %s", league_id, e)
+        return [], 'unavailable'
+
+
+def simulate_league(predictor, league_id: int, n_sims: int = 100000, seed: int = 0,
+                    workers: int = None, season: int = 2025) -> Dict:
+    """
+    Title/top-4/relegation (or qualification) probabilities for one league:
+    current standings plus every remaining fixture, played n_sims times.
+    Without standings the table starts from zero with the teams in the fixtures.
+    The result is `degraded` when either came from a fallback rather than
+    upstream; `sources` says which.
+    """
+    start = time.perf_counter()
+    fixtures, fixtures_source = _remaining_fixtures(predictor, league_id, season)
+    groups, standings_source = _standings(predictor, league_id, season)
+
+    if not groups:
+        names = {}
+        for match in fixtures:
+            names.setdefault(match.home, match.home_id)
+            names.setdefault(match.away, match.away_id)
+        groups = [[{'name': name, 'id': team_id, 'points': 0, 'goal_diff': 0, 'goals_for': 0}
+                   for name, team_id in names.items()]]
+
+    matrices = predictor.score_matrices(
+        [match.home for match in fixtures],
+        [match.away for match in fixtures],
+        [match.home_id for match in fixtures],
+        [match.away_id for match in fixtures],
+    ) if fixtures else np.empty((0, MAX_GOALS + 1, MAX_GOALS + 1))
+    zones = LEAGUE_ZONES.get(league_id, DEFAULT_ZONES)
+
+    tables = []
+    for group_number, rows in enumerate(groups):
+        slot = {row['name']: i for i, row in enumerate(rows)}
+        in_group = [j for j, match in enumerate(fixtures) if match.home in slot and match.away in slot]
+        home = np.array([slot[fixtures[j].home] for j in in_group], dtype=np.intp)
+        away = np.array([slot[fixtures[j].away] for j in in_group], dtype=np.intp)
+        result = simulate(
+            np.array([row['points'] for row in rows]),
+            np.array([row['goal_diff'] for row in rows]),
+            np.array([row['goals_for'] for row in rows]),
+            home, away, matrices[in_group], n_sims=n_sims, seed=seed + group_number, workers=workers,
+        )
+        positions = result['positions']
+        teams = [
+            {
+                'team': row['name'],
+                'points': row['points'],
+                'expected_points': round(float(result['points'][i]), 1),
+                **{zone: round(float(positions[i, slice(*bounds)].sum()) * 100, 2)
+                   for zone, bounds in zones.items()},
+                'positions': [round(p * 100, 2) for p in positions[i].tolist()],
+            }
+            for i, row in enumerate(rows)
+        ]
+        teams.sort(key=lambda team: -team['expected_points'])
+        tables.append({'group': group_number, 'remaining_fixtures': len(in_group), 'teams': teams})
+
+    return {
+        'league': league_id,
+        'season': season,
+        'simulations': n_sims,
+        'seed': seed,
+        'zones': {zone: list(bounds) for zone, bounds in zones.items()},
+        'data_version': predictor.data_version,
+        'sources': {'fixtures': fixtures_source, 'standings': standings_source},
+        'degraded': fixtures_source != 'upstream' or standings_source != 'upstream',
+        'tables': tables,
+        'elapsed_seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+if __name__ == '__main__':
+    import argparse
+
+    from predictor import FootballPredictor
+
+    parser = argparse.ArgumentParser(description='Monte Carlo season simulation')
+    parser.add_argument('-l', '--league', type=int, default=39)
+    parser.add_argument('-n', '--sims', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('-w', '--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    report = simulate_league(FootballPredictor(), args.league, args.sims, args.seed, args.workers)
+    print(f"🎲 League {args.league}: {args.sims} simulations in {report['elapsed_seconds']}s")
+    if report['degraded']:
+        print(f"⚠️  Degraded data: {report['sources']}")
+    for table in report['tables']:
+        print(f"\n   Group {table['group']} ({table['remaining_fixtures']} fixtures left)")
+        for team in table['teams']:
+            zones = ' • '.join(f"{zone} {team[zone]}%" for zone in report['zones'])
+            print(f"   {team['team']:<24}{team['expected_points']:>6} pts   {zones}")
@@ -0,0 +1,144 @@
+"""
+Startup snapshot for the Football Predictor
+One binary file holding everything a fresh worker would otherwise rebuild
+or fetch: team ratings, injuries, league metadata and cached fixtures.
+Written with pickle protocol 5; NumPy arrays go out-of-band into aligned
+blocks after the pickle and are loaded as zero-copy views of an mmap.
+Like any pickle, only load snapshots this deployment wrote itself.
+
+Usage:
+    python snapshot.py -o snapshot.bin      # warm the caches, then write
+    SNAPSHOT_PATH=snapshot.bin gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+import logging
+import mmap
+import os
+import pickle
+import struct
+import time
+from typing import Dict, List
+
+from ratings import Ratings, RatingStore
+from teams import TEAMS
+
+logger = logging.getLogger(__name__)
+
+
+MAGIC = b'FPSNAP\x00\x01'
+# Bump whenever the snapshot contents change shape
+FORMAT_VERSION = 2
+ALIGNMENT = 64
+
+_HEADER = struct.Struct('<QQ')  # pickle length, buffer count
+_LENGTH = struct.Struct('<Q')
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def write_snapshot(path: str, predictor, rating_seq: int, leagues: List[Dict]) -> int:
+    """Write the predictor's current data to `path` atomically; returns the file size"""
+    sources, state = predictor.injury_index.dump()
+    ratings = predictor.ratings
+    payload = {
+        'format': FORMAT_VERSION,
+        'created': time.time(),
+        'registry_version': TEAMS.version,
+        'rating_seq': rating_seq,
+        'ratings': {'values': ratings.values, 'as_of': ratings.as_of, 'matches': ratings.matches},
+        'injuries': {'sources': sources, 'state': state},
+        'leagues': leagues,
+        'fixtures': predictor.fixture_cache.dump(),
+    }
+
+    buffers = []
+    data = pickle.dumps(payload, protocol=5, buffer_callback=buffers.append)
+    raws = [buffer.raw() for buffer in buffers]
+
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(data), len(raws)))
+        for raw in raws:
+            f.write(_LENGTH.pack(raw.nbytes))
+        f.write(data)
+        for raw in raws:
+            f.seek(_aligned(f.tell()))
+            f.write(raw)
+        size = f.tell()
+    os.replace(tmp, path)
+    return size
+
+
+def read_snapshot(path: str) -> Dict:
+    """
+    The snapshot at `path`, or None if there is none or it was written for
+    another snapshot format or team table. Arrays in it stay backed by the
+    file mapping, read-only.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(mapped)
+        if bytes(view[:len(MAGIC)]) != MAGIC:
+            raise ValueError('not a snapshot file')
+        offset = len(MAGIC)
+        data_length, count = _HEADER.unpack_from(view, offset)
+        offset += _HEADER.size
+        lengths = [_LENGTH.unpack_from(view, offset + i * _LENGTH.size)[0] for i in range(count)]
+        offset += count * _LENGTH.size
+        data = view[offset:offset + data_length]
+        offset += data_length
+        buffers = []
+        for length in lengths:
+            offset = _aligned(offset)
+            buffers.append(view[offset:offset + length])
+            offset += length
+        snapshot = pickle.loads(data, buffers=buffers)
+    except Exception as e:
+        logger.warning("Ignoring unreadable snapshot %s: %s", path, e)
+        return None
+
+    if snapshot.get('format') != FORMAT_VERSION or snapshot.get('registry_version') != TEAMS.version:
+        logger.warning("Ignoring snapshot %s: written for another format or team table", path)
+        return None
+    return snapshot
+
+
+def snapshot_ratings(snapshot: Dict, store: RatingStore) -> Ratings:
+    """The snapshot's ratings, or None if results were stored since it was written"""
+    if snapshot is None or snapshot['rating_seq'] != store.last_seq():
+        return None
+    ratings = snapshot['ratings']
+    return Ratings(ratings['values'], as_of=ratings['as_of'], matches=ratings['matches'])
+
+
+def restore(predictor, snapshot: Dict) -> Dict:
+    """Load the snapshot's injuries and cached fixtures (also as last good data) into a predictor"""
+    injuries = snapshot['injuries']
+    predictor.injury_index.load(injuries['sources'], injuries['state'])
+    fixtures = predictor.fixture_cache.load(snapshot['fixtures'])
+    # Oldest first, so each league ends up with its newest fixtures
+    for (league_id, season, *_), _, value in snapshot['fixtures']:
+        predictor.last_good_fixtures[(league_id, season)] = value
+    return {'fixtures': fixtures, 'age_seconds': round(time.time() - snapshot['created'], 1)}
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Write a startup snapshot for the API')
+    parser.add_argument('-o', '--output', default=os.getenv('SNAPSHOT_PATH') or 'snapshot.bin')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    import api
+
+    counts = api.warm_caches()
+    size = write_snapshot(args.output, api.predictor, api.rating_store.last_seq(), api.leagues)
+    print(f"📦 Snapshot written to {args.output} ({size / 1024:.0f} KB, "
+          f"{sum(counts.values())} fixtures, {time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,249 @@
+"""
+Synthetic api-sports data for scale and load testing
+Deterministic fixtures (and injuries) for any number of leagues and teams
+over any date window, served in-process as a drop-in client or over HTTP
+through mock_upstream.py
+
+Usage:
+    FOOTBALL_API_SYNTHETIC="leagues=50,teams=20,seed=1" python api.py
+    python mock_upstream.py --synthetic leagues=200,teams=20 --error-rate 0.05
+"""
+
+import random
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, List
+
+from api_client import ApiSportsClient, ApiSportsError
+from predictor import LEAGUES
+from teams import TEAMS
+
+# Matchday 0 of every league; schedules repeat forever from here
+EPOCH = date(2020, 8, 1)  # a Saturday
+
+KICKOFFS = (time(12, 30), time(15, 0), time(17, 30), time(20, 0))
+
+FIRST_SYNTHETIC_LEAGUE_ID = 1001
+FIRST_SYNTHETIC_TEAM_ID = 100000
+
+_SYLLABLES = ('ar', 'bel', 'cas', 'dor', 'el', 'fen', 'gar', 'hol', 'is', 'kor',
+              'lin', 'mar', 'nor', 'os', 'pol', 'ros', 'sta', 'tor', 'val', 'wes')
+_SUFFIXES = ('United', 'City', 'FC', 'Athletic', 'Rovers', 'Town', 'Wanderers', 'Sporting')
+
+
+def _team_name(rng: random.Random) -> str:
+    stem = ''.join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 3)))
+    return f"{stem.capitalize()} {rng.choice(_SUFFIXES)}"
+
+
+def round_robin(n_teams: int) -> List[List[tuple]]:
+    """
+    Double round-robin by the circle method: a list of rounds, each a list
+    of (home, away) team positions. Odd team counts get a bye.
+    """
+    slots = list(range(n_teams)) + ([None] if n_teams % 2 else [])
+    half = len(slots) // 2
+    rounds = []
+    for r in range(len(slots) - 1):
+        pairs = []
+        for i in range(half):
+            home, away = slots[i], slots[-1 - i]
+            if home is None or away is None:
+                continue
+            pairs.append((home, away) if (r + i) % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        slots = [slots[0], slots[-1]] + slots[1:-1]
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+class SyntheticData:
+    """
+    Generates api-sports-shaped payloads. Everything derives from `seed`, so
+    the same arguments always give the same fixtures. The first leagues reuse
+    real league IDs and the first teams reuse TEAM_TABLE names so ratings
+    apply; the rest are made up. Each league plays a double round-robin that
+    repeats from EPOCH, so any date window has fixtures. Fixtures before
+    `today` (if given) come back finished with scores.
+    """
+
+    def __init__(self, leagues: int = 6, teams_per_league: int = 20, seed: int = 0,
+                 matchdays_per_week: int = 1, today: date = None):
+        self.seed = seed
+        self.teams_per_league = teams_per_league
+        self.matchdays_per_week = matchdays_per_week
+        self.today = today
+
+        rng = random.Random(f"synthetic-{seed}")
+        team_ids = {idx: team_id for team_id, idx in TEAMS.by_id.items()}
+        known = [(name, team_ids.get(idx)) for idx, name in enumerate(TEAMS.names)]
+        self.leagues = {}
+        self.league_ids = []
+        self._teams = {}
+        for ordinal in range(leagues):
+            if ordinal < len(LEAGUES):
+                league = dict(LEAGUES[ordinal])
+            else:
+                league_id = FIRST_SYNTHETIC_LEAGUE_ID + ordinal - len(LEAGUES)
+                league = {'id': league_id, 'name': f"Synthetic League {league_id}",
+                          'country': 'Synthetica', 'flag': '🧪'}
+            self.leagues[league['id']] = league
+            self.league_ids.append(league['id'])
+
+            teams = []
+            for slot in range(teams_per_league):
+                position = ordinal * teams_per_league + slot
+                if position < len(known):
+                    name, team_id = known[position]
+                    team_id = team_id or FIRST_SYNTHETIC_TEAM_ID + position
+                else:
+                    name, team_id = _team_name(rng), FIRST_SYNTHETIC_TEAM_ID + position
+                teams.append({'id': team_id, 'name': name, 'logo': ''})
+            self._teams[league['id']] = (ordinal, teams)
+
+        self._rounds = round_robin(teams_per_league)
+
+    @classmethod
+    def from_spec(cls, spec: str) -> 'SyntheticData':
+        """Build from "leagues=50,teams=20,seed=1,per_week=2,today=2025-10-01" (all optional)"""
+        options = dict(part.split('=', 1) for part in spec.split(',') if '=' in part)
+        today = options.get('today')
+        return cls(
+            leagues=int(options.get('leagues', 6)),
+            teams_per_league=int(options.get('teams', 20)),
+            seed=int(options.get('seed', 0)),
+            matchdays_per_week=int(options.get('per_week', 1)),
+            today=date.fromisoformat(today) if today else None,
+        )
+
+    def _matchday_date(self, matchday: int) -> date:
+        week, slot = divmod(matchday, self.matchdays_per_week)
+        # Weekend round, then midweek (Wednesday) rounds
+        return EPOCH + timedelta(weeks=week, days=0 if slot == 0 else 3 + slot)
+
+    def _matchdays(self, from_date: date, to_date: date) -> range:
+        per_week = self.matchdays_per_week
+        first = max(0, ((from_date - EPOCH).days // 7 - 1) * per_week)
+        last = ((to_date - EPOCH).days // 7 + 1) * per_week
+        return range(first, last + 1)
+
+    def fixtures(self, league_id: int, season: int = None, from_date: str = None, to_date: str = None,
+                 **params) -> List[Dict]:
+        """Fixtures for one league in [from_date, to_date] (default: the next 7 days)"""
+        if league_id not in self._teams:
+            return []
+        start = date.fromisoformat(from_date) if from_date else date.today()
+        end = date.fromisoformat(to_date) if to_date else start + timedelta(days=7)
+        ordinal, teams = self._teams[league_id]
+        league = self.leagues[league_id]
+
+        fixtures = []
+        for matchday in self._matchdays(start, end):
+            day = self._matchday_date(matchday)
+            if not start <= day <= end:
+                continue
+            round_number = matchday % len(self._rounds)
+            for slot, (home, away) in enumerate(self._rounds[round_number]):
+                fixture_id = (ordinal + 1) * 10 ** 9 + matchday * 1000 + slot
+                fixtures.append(self._fixture(fixture_id, day, league, round_number, teams[home], teams[away]))
+        return fixtures
+
+    def _fixture(self, fixture_id: int, day: date, league: Dict, round_number: int,
+                 home: Dict, away: Dict) -> Dict:
+        rng = random.Random(f"{self.seed}-{fixture_id}")
+        kickoff = datetime.combine(day, rng.choice(KICKOFFS), tzinfo=timezone.utc)
+        finished = self.today is not None and day < self.today
+        goals = {'home': None, 'away': None}
+        if finished:
+            goals = {'home': _poisson(rng, 1.45), 'away': _poisson(rng, 1.15)}
+        return {
+            'fixture': {
+                'id': fixture_id,
+                'date': kickoff.isoformat(),
+                'timestamp': int(kickoff.timestamp()),
+                'venue': {'name': f"{home['name']} Stadium"},
+                'status': {'short': 'FT' if finished else 'NS'},
+            },
+            'league': {
+                'id': league['id'],
+                'name': league['name'],
+                'country': league['country'],
+                'flag': league['flag'],
+                'season': kickoff.year if kickoff.month >= 7 else kickoff.year - 1,
+                'round': f"Regular Season - {round_number + 1}",
+            },
+            'teams': {'home': dict(home), 'away': dict(away)},
+            'goals': goals,
+        }
+
+    def injuries(self, league_id: int, season: int = None, **params) -> List[Dict]:
+        """A deterministic handful of absences for the league's coming week"""
+        if league_id not in self._teams:
+            return []
+        today = self.today or date.today()
+        week = (today - EPOCH).days // 7
+        rng = random.Random(f"{self.seed}-injuries-{league_id}-{week}")
+        upcoming = self.fixtures(league_id, from_date=today.isoformat(),
+                                 to_date=(today + timedelta(days=7)).isoformat())
+        records = []
+        for match in upcoming:
+            for side in ('home', 'away'):
+                team = match['teams'][side]
+                for n in range(rng.choice((0, 0, 1, 1, 2, 3))):
+                    records.append({
+                        'player': {
+                            'id': team['id'] * 100 + n,
+                            'name': f"{team['name']} Player {n + 1}",
+                            'type': rng.choice(('Missing Fixture', 'Missing Fixture', 'Questionable')),
+                            'reason': rng.choice(('Injury', 'Suspended', 'Illness')),
+                        },
+                        'team': {'id': team['id'], 'name': team['name']},
+                        'fixture': {'id': match['fixture']['id'], 'date': match['fixture']['date']},
+                        'league': {'id': league_id, 'season': match['league']['season']},
+                    })
+        return records
+
+    def response(self, path: str, params: Dict = None) -> List[Dict]:
+        """The `response` list api-sports would return for GET <path>?<params>"""
+        params = dict(params or {})
+        endpoint = path.strip('/')
+        league_id = int(params.pop('league', 0) or 0)
+        season = params.pop('season', None)
+        if endpoint == 'fixtures':
+            return self.fixtures(league_id, season, params.pop('from', None), params.pop('to', None))
+        if endpoint == 'injuries':
+            return self.injuries(league_id, season)
+        if endpoint == 'standings':
+            return []
+        raise ApiSportsError(f"No synthetic data for /{endpoint}", status=404)
+
+
+class SyntheticApiClient(ApiSportsClient):
+    """
+    In-process stand-in for the upstream that answers from SyntheticData,
+    with no network, rate limit or latency
+    """
+
+    def __init__(self, data: SyntheticData):
+        self.data = data
+        self.league_ids = data.league_ids
+        self.rate_limit = {}
+        self.requests = 0
+
+    def get(self, path: str, params: Dict = None) -> List[Dict]:
+        self.requests += 1
+        return self.data.response(path, params)
+
+    def stats(self) -> Dict:
+        return {'synthetic_leagues': len(self.league_ids), 'requests': self.requests}
+
+    def close(self):
+        pass
+
+
+def _poisson(rng: random.Random, lam: float) -> int:
+    """Knuth's method; fine for football-sized means"""
+    limit = 2.718281828459045 ** -lam
+    goals, product = 0, rng.random()
+    while product > limit:
+        goals += 1
+        product *= rng.random()
+    return goals
@@ -0,0 +1,181 @@
+"""
+Team registry for the Football Predictor
+Maps api-sports team IDs, names and aliases to a dense integer index,
+with ratings stored in a compact read-only array built once at import
+"""
+
+import hashlib
+from types import MappingProxyType
+from typing import List, Sequence
+
+import numpy as np
+
+
+DEFAULT_STRENGTH = 70
+
+# (name, strength rating, api-sports team id or None, aliases)
+TEAM_TABLE = [
+    # Premier League
+    ('Manchester City', 95, 50, ('Man City',)),
+    ('Arsenal', 90, 42, ()),
+    ('Liverpool', 89, 40, ()),
+    ('Aston Villa', 82, 66, ()),
+    ('Tottenham', 81, 47, ('Tottenham Hotspur', 'Spurs')),
+    ('Manchester United', 80, 33, ('Man United', 'Man Utd')),
+    ('Chelsea', 79, 49, ()),
+    ('Newcastle United', 78, 34, ('Newcastle',)),
+    ('Brighton', 75, 51, ('Brighton & Hove Albion',)),
+    ('West Ham', 74, 48, ('West Ham United',)),
+    ('Everton', 70, 45, ()),
+    ('Fulham', 69, 36, ()),
+
+    # La Liga
+    ('Real Madrid', 96, 541, ()),
+    ('Barcelona', 91, 529, ('FC Barcelona',)),
+    ('Atletico Madrid', 87, 530, ('Atlético Madrid',)),
+    ('Real Sociedad', 79, 548, ()),
+    ('Athletic Bilbao', 77, 531, ('Athletic Club',)),
+    ('Real Betis', 76, 543, ()),
+    ('Villarreal', 75, 533, ()),
+    ('Valencia', 73, 532, ()),
+    ('Sevilla', 72, 536, ()),
+    ('Girona', 74, 547, ()),
+
+    # Serie A
+    ('Inter Milan', 92, 505, ('Inter',)),
+    ('AC Milan', 85, 489, ()),
+    ('Juventus', 84, 496, ()),
+    ('Napoli', 83, 492, ()),
+    ('Roma', 80, 497, ('AS Roma',)),
+    ('Lazio', 79, 487, ()),
+    ('Atalanta', 82, 499, ()),
+    ('Fiorentina', 76, 502, ()),
+    ('Bologna', 74, 500, ()),
+
+    # Bundesliga
+    ('Bayern Munich', 94, 157, ('Bayern München', 'Bayern Munchen')),
+    ('Bayer Leverkusen', 88, 168, ()),
+    ('RB Leipzig', 84, 173, ()),
+    ('Borussia Dortmund', 86, 165, ()),
+    ('Union Berlin', 76, 182, ()),
+    ('Eintracht Frankfurt', 75, 169, ()),
+    ('VfB Stuttgart', 77, 172, ()),
+    ('Wolfsburg', 73, 161, ('VfL Wolfsburg',)),
+    ('Freiburg', 74, 160, ('SC Freiburg',)),
+
+    # Ligue 1
+    ('Paris Saint-Germain', 93, 85, ('Paris Saint Germain', 'PSG')),
+    ('Monaco', 80, 91, ()),
+    ('Marseille', 79, 81, ()),
+    ('Lyon', 77, 80, ()),
+    ('Lille', 78, 79, ()),
+    ('Nice', 76, 84, ()),
+
+    # Other Champions League Teams
+    ('Porto', 81, None, ('FC Porto',)),
+    ('Benfica', 80, None, ()),
+    ('Sporting CP', 79, None, ('Sporting Lisbon',)),
+    ('Ajax', 78, None, ()),
+    ('PSV', 80, None, ('PSV Eindhoven',)),
+    ('Celtic', 74, None, ()),
+    ('Red Bull Salzburg', 76, None, ()),
+    ('Shakhtar Donetsk', 75, None, ()),
+
+    # World Cup 2026 - National Teams
+    ('Brazil', 94, 6, ()),
+    ('Argentina', 93, 26, ()),
+    ('France', 92, 2, ()),
+    ('England', 90, 10, ()),
+    ('Spain', 89, 9, ()),
+    ('Germany', 88, 25, ()),
+    ('Portugal', 87, 27, ()),
+    ('Belgium', 86, 1, ()),
+    ('Netherlands', 87, None, ()),
+    ('Italy', 85, 768, ()),
+    ('Uruguay', 82, 7, ()),
+    ('Colombia', 81, 8, ()),
+    ('Mexico', 78, 16, ()),
+    ('USA', 80, None, ('United States',)),
+    ('Canada', 76, None, ()),
+    ('Japan', 77, 12, ()),
+    ('South Korea', 77, 17, ('Korea Republic',)),
+    ('Morocco', 79, 31, ()),
+    ('Croatia', 83, 3, ()),
+    ('Denmark', 80, 21, ()),
+    ('Switzerland', 79, 15, ()),
+    ('Poland', 78, 24, ()),
+    ('Senegal', 78, 13, ()),
+    ('Nigeria', 76, 19, ()),
+    ('Egypt', 76, 32, ()),
+    ('Ghana', 75, None, ()),
+    ('Cameroon', 75, None, ()),
+    ('Iran', 74, 22, ()),
+    ('Saudi Arabia', 73, 23, ()),
+    ('Australia', 75, 20, ()),
+    ('Ecuador', 77, None, ()),
+    ('Peru', 75, 30, ()),
+    ('Chile', 76, None, ()),
+]
+
+
+class TeamRegistry:
+    """
+    Immutable team lookup table.
+
+    Every known team gets a dense index 0..n-1; index n is a shared slot for
+    unknown teams carrying DEFAULT_STRENGTH, so lookups never need a branch
+    and `ratings[indices]` works on whole arrays.
+    """
+
+    def __init__(self, table: Sequence = TEAM_TABLE, default_strength: int = DEFAULT_STRENGTH):
+        self.names = tuple(row[0] for row in table)
+        self.unknown = len(self.names)
+
+        by_name = {}
+        by_id = {}
+        for idx, (name, _, team_id, aliases) in enumerate(table):
+            for key in (name,) + tuple(aliases):
+                by_name[key] = idx
+            if team_id is not None:
+                by_id[team_id] = idx
+        self.by_name = MappingProxyType(by_name)
+        self.by_id = MappingProxyType(by_id)
+
+        ratings = np.array([row[1] for row in table] + [default_strength], dtype=np.int16)
+        ratings.setflags(write=False)
+        self.ratings = ratings
+
+        digest = hashlib.sha256(repr([(row[0], row[1]) for row in table]).encode())
+        self.version = digest.hexdigest()[:12]
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def index(self, name: str = None, team_id: int = None) -> int:
+        """Dense index for a team, preferring the api-sports ID when known"""
+        if team_id is not None:
+            idx = self.by_id.get(team_id)
+            if idx is not None:
+                return idx
+        return self.by_name.get(name, self.unknown)
+
+    def indices(self, names: Sequence[str], team_ids: Sequence[int] = None) -> np.ndarray:
+        """Vectorized `index` over parallel name/ID lists"""
+        if team_ids is None:
+            by_name = self.by_name
+            unknown = self.unknown
+            return np.array([by_name.get(name, unknown) for name in names], dtype=np.int32)
+        return np.array([self.index(name, team_id) for name, team_id in zip(names, team_ids)],
+                        dtype=np.int32)
+
+    def rating(self, name: str = None, team_id: int = None) -> int:
+        return self.ratings.item(self.index(name, team_id))
+
+    def names_for(self, indices) -> List[str]:
+        """Every name and alias that resolves to one of `indices`"""
+        indices = set(indices)
+        return [name for name, idx in self.by_name.items() if idx in indices]
+
+
+# Built once at import and shared by every predictor
+TEAMS = TeamRegistry()
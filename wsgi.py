@@ -0,0 +1,8 @@
+"""
+WSGI entry point for production serving
+    gunicorn -c gunicorn.conf.py wsgi:app
+"""
+
+from api import app
+
+__all__ = ['app']